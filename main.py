@@ -1,7 +1,38 @@
+import sys
+from src.utils.startup import profiler # First, so startup is timed from here
+if "--profile-startup" in sys.argv:
+    profiler.enable() # Before the imports below, so they show up in the report
+import argparse
+import multiprocessing
 import tkinter as tk
-from src.ui.app import SCGMAutoBR
 
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = SCGMAutoBR(root)
+def main():
+    parser = argparse.ArgumentParser(description="SCGM Auto BR")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report import and init time per module once the window is shown, then exit")
+    parser.add_argument("--startup-budget", type=float, metavar="SECONDS",
+                        help="With --profile-startup: exit with status 1 if the first window took longer")
+    args = parser.parse_args()
+
+    with profiler.step("import src.ui.app"):
+        from src.ui.app import SCGMAutoBR
+    with profiler.step("tk.Tk()"):
+        root = tk.Tk()
+    with profiler.step("SCGMAutoBR()"):
+        app = SCGMAutoBR(root)
+    root.wait_visibility()
+    root.update_idletasks()
+    profiler.window_shown()
+
+    if args.profile_startup:
+        print(profiler.report())
+        root.destroy()
+        if args.startup_budget is not None and profiler.first_window > args.startup_budget:
+            print(f"First window took {profiler.first_window:.3f}s, over the {args.startup_budget:.3f}s budget")
+            sys.exit(1)
+        return
     root.mainloop()
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support() # Match worker processes in the frozen executable
+    main()
@@ -0,0 +1,194 @@
+"""Pluggable clock, screen source and input sink used by the engine, vision and controller.
+
+The defaults drive the real screen, mouse and keyboard. The replay backends feed recorded
+frames on a virtual clock and record every input action instead of performing it.
+"""
+import os
+import time
+import threading
+
+class SystemClock:
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+class VirtualClock:
+    """A clock that only moves when someone sleeps, so replays run faster than real time."""
+    def __init__(self, start=0.0):
+        self._now = start
+        self._lock = threading.Lock()
+
+    def time(self):
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            with self._lock:
+                self._now += seconds
+
+class ScreenSource:
+    """Captures the live screen. region is (left, top, width, height), like pyautogui."""
+    def grab(self, region=None):
+        import pyautogui
+        return pyautogui.screenshot(region=region)
+
+class ReplaySource:
+    """Serves recorded frames from a directory of images or a video file on a clock.
+
+    Frame i is on screen from i / fps seconds after the first grab. `switch_times` lists the
+    clock times at which the served frame changed, to measure reaction latency.
+    """
+    IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, path, clock, fps=2.0):
+        from PIL import Image
+        self._image_cls = Image
+        self.clock = clock
+        self.fps = fps
+        self.start = None
+        self.switch_times = []
+        self._index = -1
+        self._current = None
+        self._files = None
+        self._video = None
+
+        if os.path.isdir(path):
+            self._files = sorted(os.path.join(path, f) for f in os.listdir(path)
+                                 if f.lower().endswith(self.IMAGE_EXTS))
+            self.frame_count = len(self._files)
+        else:
+            import cv2
+            self._video = cv2.VideoCapture(path)
+            self.fps = self._video.get(cv2.CAP_PROP_FPS) or fps
+            self.frame_count = int(self._video.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    @property
+    def exhausted(self):
+        return self.start is not None and self._frame_index() >= self.frame_count
+
+    def _frame_index(self):
+        return int((self.clock.time() - self.start) * self.fps)
+
+    def _load(self, index):
+        if self._files is not None:
+            return self._image_cls.open(self._files[index]).convert("RGB")
+        import cv2
+        image = None
+        while self._index < index: # Videos are decoded forward only
+            ok, bgr = self._video.read()
+            if not ok:
+                break
+            image = bgr
+            self._index += 1
+        if image is None:
+            return self._current
+        return self._image_cls.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+    def grab(self, region=None):
+        if self.start is None:
+            self.start = self.clock.time()
+        index = min(self._frame_index(), self.frame_count - 1)
+        if index != self._index or self._current is None:
+            self._current = self._load(index)
+            self._index = index
+            self.switch_times.append(self.clock.time())
+        if region:
+            left, top, width, height = region
+            return self._current.crop((left, top, left + width, top + height))
+        return self._current
+
+class InputSink:
+    """Sends input to the game through pydirectinput."""
+    def __init__(self):
+        import pydirectinput
+        self._pdi = pydirectinput
+
+    def move_to(self, x, y, duration=0.0):
+        self._pdi.moveTo(int(x), int(y), duration=duration)
+
+    def move_rel(self, dx, dy):
+        self._pdi.moveRel(dx, dy, relative=True)
+
+    def mouse_down(self):
+        self._pdi.mouseDown()
+
+    def mouse_up(self):
+        self._pdi.mouseUp()
+
+    def click(self):
+        self._pdi.click()
+
+    def press(self, key):
+        self._pdi.press(key)
+
+    def key_down(self, key):
+        self._pdi.keyDown(key)
+
+    def key_up(self, key):
+        self._pdi.keyUp(key)
+
+class RecordingSink:
+    """Records every input action with its clock time instead of performing it."""
+    def __init__(self, clock):
+        self.clock = clock
+        self.actions = [] # (time, action, args)
+        self.position = (0, 0)
+
+    def _record(self, action, *args):
+        self.actions.append((self.clock.time(), action, args))
+
+    def move_to(self, x, y, duration=0.0):
+        self._record("move_to", int(x), int(y))
+        self.clock.sleep(duration) # The real move blocks for its duration
+        self.position = (int(x), int(y))
+
+    def move_rel(self, dx, dy):
+        self._record("move_rel", dx, dy)
+        self.position = (self.position[0] + dx, self.position[1] + dy)
+
+    def mouse_down(self):
+        self._record("mouse_down", *self.position)
+
+    def mouse_up(self):
+        self._record("mouse_up", *self.position)
+
+    def click(self):
+        self._record("click", *self.position)
+
+    def press(self, key):
+        self._record("press", key)
+
+    def key_down(self, key):
+        self._record("key_down", key)
+
+    def key_up(self, key):
+        self._record("key_up", key)
+
+_backends = {"clock": SystemClock(), "source": None, "sink": None}
+
+def use(clock=None, source=None, sink=None):
+    """Replaces the active backends. Unset ones keep their current value."""
+    if clock is not None:
+        _backends["clock"] = clock
+    if source is not None:
+        _backends["source"] = source
+    if sink is not None:
+        _backends["sink"] = sink
+
+def clock():
+    return _backends["clock"]
+
+def source():
+    # Live backends are created on first use so replays never import pyautogui/pydirectinput
+    if _backends["source"] is None:
+        _backends["source"] = ScreenSource()
+    return _backends["source"]
+
+def sink():
+    if _backends["sink"] is None:
+        _backends["sink"] = InputSink()
+    return _backends["sink"]
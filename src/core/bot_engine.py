@@ -1,19 +1,56 @@
-import time
 import random
+import functools
 import traceback
-import pydirectinput
-import pyautogui
-from src.core.vision import is_image_visible, find_and_click
-from src.core.controller import human_click
+from src.core.vision import find_and_click, capture_stats, capture_area, encode_image
+from src.core.vision_worker import VisionWorker
+from src.core.controller import executor, click_actions, hold_actions, use_target, Action
+from src.core import backends
 from src.utils.discord import send_discord
+from src.utils.metrics import metrics
+from src.utils.history import history_for, MatchRecord
+
+# Templates each phase checks, evaluated together in one detect_all call per tick
+LOBBY_TARGETS = ["return_to_lobby_alone", "ultimate", "open", "continue", "solo_mode", "br_mode", "change"]
+WAITING_TARGETS = ["return_to_lobby_alone", "ultimate", "change"]
+RESULT_TARGETS = ["open", "continue", "return_to_lobby_alone"]
+END_TARGETS = ["open", "continue"]
+ALL_TARGETS = sorted(set(LOBBY_TARGETS + WAITING_TARGETS + RESULT_TARGETS))
+
+def timed_phase(name):
+    """Records how long an engine phase ran in the phase_seconds histogram and the match record."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            started = self.clock.time()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.phase_done(name, self.clock.time() - started)
+        return wrapper
+    return decorator
 
 class BotEngine:
-    def __init__(self, app):
-        self.app = app # Reference to the main UI app for config and logging
+    def __init__(self, app, grab=None, target=None):
+        self.app = app # Reference to the main UI app (or a BotInstance) for config and logging
+        self.target = target # Input target, e.g. the instance's game window
         self.last_leave_click_time = 0
         self.last_punch_time = 0
         self.match_start_time = 0
+        self.clicked_at = None # Time of the last click; reads after it wait for a newer frame
+        self.match_phases = {} # Phase durations of the current match, for the history
+        self.cycle_start = None # Bot start or end of the previous match: running time of the next one
         self.last_lobby_log_time = 0 # New: Track last log to prevent spam
+        self.lobby_search_start = None
+        self.vision = VisionWorker(lambda: self.config, ALL_TARGETS, self.log, grab)
+
+    @property
+    def config(self):
+        """Read-only snapshot of the app config, replaced whenever the UI saves a change."""
+        return self.app.config.snapshot()
+
+    @property
+    def clock(self):
+        return backends.clock()
 
     def is_running(self):
         return self.app.is_running
@@ -21,102 +58,192 @@ class BotEngine:
     def log(self, msg, is_error=False):
         self.app.log(msg, is_error)
 
+    @property
+    def scan(self):
+        return self.vision.scheduler
+
+    def enter_phase(self, phase, targets):
+        """Tells the scan scheduler which phase runs; a no-op while it stays the same."""
+        if self.scan.phase != phase:
+            self.scan.enter(phase, targets)
+
+    def wait(self, seconds, names=END_TARGETS):
+        """Sleeps up to `seconds`; returns True early if one of `names` appears on screen."""
+        return self.vision.wait_for(names, seconds) is not None
+
+    def phase_done(self, phase, seconds):
+        metrics.observe("phase_seconds", seconds, phase=phase)
+        self.match_phases[phase] = self.match_phases.get(phase, 0.0) + seconds
+
+    def record_match(self, end_reason, outcome=None):
+        """Appends the match that just ended to the match history and starts a new record."""
+        now = self.clock.time()
+        running = now - self.cycle_start if self.cycle_start is not None else 0.0
+        self.cycle_start = now
+        history = history_for(self.config.get("history_file"))
+        if history is not None:
+            history.log = self.log
+            history.record(MatchRecord(
+                started=self.match_start_time, ended=now,
+                mode=self.config.get("match_mode", "full"), end_reason=end_reason,
+                phases=self.match_phases, outcome=outcome if self.config.get("history_images", True) else None,
+                instance=getattr(self.app, "name", ""), running=running))
+        self.match_phases = {}
+        self.match_start_time = 0 # A post-match entered from the lobby estimates its own start
+
+    def dump_recording(self, reason):
+        """Saves the flight recorder's last frames and scores for a failure."""
+        self.vision.recorder.dump(reason, getattr(self.app, "name", ""))
+
+    def click(self, img_name, seen, clicks=1):
+        """find_and_click on this tick's detections.
+
+        A click changes the screen: the template's cached result is dropped and the next
+        latest() waits for a frame captured after the click.
+        """
+        if not find_and_click(img_name, self.config, self.is_running, self.log, clicks=clicks, detections=seen):
+            return False
+        self.clicked_at = self.clock.time()
+        self.vision.forget([img_name])
+        return True
+
+    def latest(self):
+        """The latest detections, from a frame captured after the last click."""
+        return self.vision.latest(after=self.clicked_at)
+
+    def afk_click(self, jitter=False):
+        """Queues a short held click at the current position without waiting for it."""
+        actions = [Action(0.1, "mouse_down", ()), Action(0.2, "mouse_up", ())]
+        if jitter:
+            actions.insert(0, Action(0.0, "move_rel", (1, 1)))
+        executor.submit(actions, name="afk_click")
+
     def bot_loop(self):
+        use_target(self.target)
+        capture_stats(reset=True)
+        self.match_phases = {}
+        self.cycle_start = self.clock.time()
+        if self.config.get("vision_worker", True):
+            self.vision.start()
+        threaded_input = self.config.get("input_thread", True)
+        if threaded_input:
+            executor.start()
+        try:
+            self._bot_loop()
+        finally:
+            if threaded_input:
+                executor.stop() # Cancels this engine's queued input and releases held keys
+            self.vision.stop()
+
+    def end_lobby_search(self):
+        """Records the lobby search time when the loop hands over to a match phase."""
+        if self.lobby_search_start is not None:
+            self.phase_done("lobby_search", self.clock.time() - self.lobby_search_start)
+        self.lobby_search_start = None
+
+    def _bot_loop(self):
         while self.is_running():
             try:
+                if self.lobby_search_start is None:
+                    self.lobby_search_start = self.clock.time()
+                self.enter_phase("lobby", LOBBY_TARGETS)
                 self.app.update_status("CHECK / STARTING", "blue")
+                seen = self.latest() # One capture, one batch, from the vision worker
                 
                 # Phase 1: New Check - If see Return button in Lobby state, handle it.
-                if is_image_visible("return_to_lobby_alone", self.app.config, confidence=0.7):
-                    if time.time() - self.last_lobby_log_time > 60: # Log only once every 60s
+                if seen.visible("return_to_lobby_alone"):
+                    if self.clock.time() - self.last_lobby_log_time > 60: # Log only once every 60s
                         self.log("Return to lobby detected during Lobby phase.")
-                        if self.app.config.get("match_mode") == "quick":
+                        if self.config.get("match_mode") == "quick":
                             self.log("Quick Leave: Exiting match...")
                         else:
                             self.log("Found Return button, but mode is FULL. Wait for the end of the match...")
-                        self.last_lobby_log_time = time.time()
+                        self.last_lobby_log_time = self.clock.time()
                     
-                    if self.app.config.get("match_mode") == "quick":
-                        find_and_click("return_to_lobby_alone", self.app.config, self.is_running, self.log, clicks=2)
-                    elif time.time() - self.last_leave_click_time > 60:
+                    if self.config.get("match_mode") == "quick":
+                        self.click("return_to_lobby_alone", seen, clicks=2)
+                    elif self.clock.time() - self.last_leave_click_time > 60:
                         # Full Match AFK Prevention: Move to button but click at current pos to be safe
                         # or just click at current pos after a small move
-                        pydirectinput.moveRel(1, 1, relative=True) # Small jitter
-                        time.sleep(0.1)
-                        pydirectinput.mouseDown()
-                        time.sleep(0.1)
-                        pydirectinput.mouseUp()
-                        self.last_leave_click_time = time.time()
+                        self.afk_click(jitter=True)
+                        self.last_leave_click_time = self.clock.time()
                 
                 # Phase 1: Ultimate Check - Jump to Setup Stats if found
-                if is_image_visible("ultimate", self.app.config):
+                if seen.visible("ultimate"):
                     self.log("Ultimate bar detected during Lobby/Check phase! Jumping to Auto-Punch...")
                     self.app.match_count += 1
                     self.app.update_match_count()
                     self.app.update_status("AUTO-PUNCHING", "green")
-                    self.match_start_time = time.time() # Start timing
+                    self.match_start_time = self.clock.time() # Start timing
+                    self.end_lobby_search()
                     self.auto_punch()
                     self.handle_post_match()
                     continue
 
-                if is_image_visible("open", self.app.config) or is_image_visible("continue", self.app.config):
+                if seen.visible("open") or seen.visible("continue"):
                     self.log("End-match screen detected! Jumping to results...")
+                    self.end_lobby_search()
                     self.handle_post_match()
                     continue
 
-                if is_image_visible("solo_mode", self.app.config):
-                    if find_and_click("solo_mode", self.app.config, self.is_running, self.log):
+                if seen.visible("solo_mode"):
+                    if self.click("solo_mode", seen):
                         self.log("Solo clicked. Entering match sequence...")
+                        self.end_lobby_search()
                         self.handle_match_waiting()
                         continue
-                elif is_image_visible("br_mode", self.app.config):
-                    find_and_click("br_mode", self.app.config, self.is_running, self.log)
+                elif seen.visible("br_mode"):
+                    self.click("br_mode", seen)
                 else:
-                    find_and_click("change", self.app.config, self.is_running, self.log)
+                    self.click("change", seen)
                 
-                time.sleep(self.app.config["scan_interval"])
+                self.wait(self.scan.interval(), LOBBY_TARGETS)
                 
             except Exception as e:
                 self.log(f"Loop Error: {e}", is_error=True)
+                self.dump_recording("exception")
                 # traceback logic can stay in UI or here
-                time.sleep(5)
+                self.clock.sleep(5)
 
     def handle_match_waiting(self):
         self.log("Waiting for Ultimate bar...")
         match_started = False
         ultimate_triggered = False
         self.app.update_status("WAITING FOR MATCH", "orange")
+        self.enter_phase("match_waiting", WAITING_TARGETS)
         
-        start_wait = time.time()
-        self.match_start_time = time.time()
-        last_log_time = time.time()
+        start_wait = self.clock.time()
+        self.match_start_time = self.clock.time()
+        last_log_time = self.clock.time()
         
         # Phase 2: Timeout reduced to 8 minutes (480s)
-        while time.time() - start_wait < 480 and self.is_running():
-            if time.time() - last_log_time > 30:
-                elapsed = int(time.time() - start_wait)
+        while self.clock.time() - start_wait < 480 and self.is_running():
+            if self.clock.time() - last_log_time > 30:
+                elapsed = int(self.clock.time() - start_wait)
                 self.log(f"Still waiting for Ultimate... to trigger auto-punch ({elapsed}s elapsed)")
-                last_log_time = time.time()
+                last_log_time = self.clock.time()
 
-            if is_image_visible("return_to_lobby_alone", self.app.config, confidence=0.7):
+            seen = self.latest()
+            if seen.visible("return_to_lobby_alone"):
                 self.log("Game loaded: 'Return to lobby' detected.")
                 match_started = True
                 break
             
-            if is_image_visible("ultimate", self.app.config):
+            if seen.visible("ultimate"):
                 self.log("Game loaded: 'Ultimate' button detected!")
                 match_started = True
                 ultimate_triggered = True
                 break
             
-            if is_image_visible("change", self.app.config):
+            if seen.visible("change"):
                 self.log("Lobby detected (Queue cancelled). Retrying sequence.")
-                return
+                break
 
-            time.sleep(0.5)
+            self.wait(self.scan.interval(), WAITING_TARGETS)
         
+        self.phase_done("match_waiting", self.clock.time() - start_wait)
         if match_started:
-            self.match_start_time = time.time() # Start timing NOW
+            self.match_start_time = self.clock.time() # Start timing NOW
             self.app.match_count += 1
             self.app.update_match_count()
             self.log(f"Match #{self.app.match_count} STARTED!")
@@ -130,202 +257,238 @@ class BotEngine:
             
             self.handle_post_match()
 
+    @timed_phase("in_game")
     def random_move(self):
-        mode = self.app.config.get("match_mode", "full")
+        mode = self.config.get("match_mode", "full")
         self.log(f"Starting phase: {mode.upper()} MODE")
+        self.enter_phase("in_game", RESULT_TARGETS)
         
-        keys_cfg = self.app.config.get("keys", {})
+        keys_cfg = self.config.get("keys", {})
         keys = [
             keys_cfg.get("forward", "w"),
             keys_cfg.get("left", "a"),
             keys_cfg.get("backward", "s"),
             keys_cfg.get("right", "d")
         ]
-        start_game_time = time.time()
+        start_game_time = self.clock.time()
         
         while self.is_running():
             key = random.choice(keys)
             duration = random.uniform(0.2, 0.6)
-            pydirectinput.keyDown(key)
-            time.sleep(duration)
-            pydirectinput.keyUp(key)
+            hold = executor.submit(hold_actions(key, duration), name="move")
+            if self.wait(duration): # Released early if the results screen shows up
+                hold.cancel()
 
-            if is_image_visible("open", self.app.config) or is_image_visible("continue", self.app.config):
+            seen = self.latest()
+            if seen.visible("open") or seen.visible("continue"):
                 self.log("End-match screen detected! Stopping phase.")
+                executor.cancel_all()
                 break
             
-            is_leave_v = is_image_visible("return_to_lobby_alone", self.app.config, confidence=0.7)
-            if is_leave_v and (time.time() - self.last_leave_click_time > 60):
-                if self.app.config.get("match_mode") == "quick":
-                    if find_and_click("return_to_lobby_alone", self.app.config, self.is_running, self.log, clicks=2):
+            is_leave_v = seen.visible("return_to_lobby_alone")
+            if is_leave_v and (self.clock.time() - self.last_leave_click_time > 60):
+                if self.config.get("match_mode") == "quick":
+                    if self.click("return_to_lobby_alone", seen, clicks=2):
                         self.log("Quick Leave: Exit button clicked (2x).")
-                        self.last_leave_click_time = time.time()
+                        self.last_leave_click_time = self.clock.time()
                 else: 
                     # AFK Prevention: Click with hold
-                    pydirectinput.mouseDown()
-                    time.sleep(0.1)
-                    pydirectinput.mouseUp()
-                    self.last_leave_click_time = time.time()
+                    self.afk_click()
+                    self.last_leave_click_time = self.clock.time()
             
             if random.random() < 0.2:
-                pydirectinput.moveRel(random.randint(-120, 120), 0, relative=True)
+                executor.submit([Action(0.0, "move_rel", (random.randint(-120, 120), 0))], name="look")
             
-            if time.time() - start_game_time > 1080:
+            if self.clock.time() - start_game_time > 1080:
                 self.log("Max match time reached (18m). Force checking for end buttons.")
                 break
             
-            time.sleep(random.uniform(0.5, 1.2))
+            self.wait(random.uniform(0.5, 1.2))
         
         self.log("Match phase complete.")
 
+    @timed_phase("auto_punch")
     def auto_punch(self):
         try:
             # Phase 3: Wait 5 seconds before starting Setup Stats
             self.log("AUTO-PUNCH TRIGGERED! Waiting 5s before setup...")
-            time.sleep(5.0)
+            self.enter_phase("auto_punch", RESULT_TARGETS)
+            if self.wait(5.0):
+                self.log("Results screen appeared before setup. Skipping auto-punch.")
+                return
             
             self.log("Setting up stats...")
-            keys_cfg = self.app.config.get("keys", {})
+            keys_cfg = self.config.get("keys", {})
             menu_key = keys_cfg.get("menu", "m")
             slot1_key = keys_cfg.get("slot_1", "1")
 
-            pydirectinput.press(menu_key)
-            time.sleep(1.0)
+            # The whole setup is one timed sequence; detection keeps running while it plays
+            actions = [Action(0.0, "press", (menu_key,))]
+            pos1 = self.config.get("pos_1", [0, 0])
+            clicks, t = click_actions(pos1[0], pos1[1], start=1.0)
+            actions += clicks
+            t += 1.5
             
-            pos1 = self.app.config.get("pos_1", [0, 0])
-            human_click(pos1[0], pos1[1], self.is_running)
-            time.sleep(1.5)
-            
-            pos2 = self.app.config.get("pos_2", [0, 0])
+            pos2 = self.config.get("pos_2", [0, 0])
             for i in range(11):
-                if not self.is_running(): break
-                human_click(pos2[0], pos2[1], self.is_running, move=(i==0))
-                if i > 0: time.sleep(0.2)
+                clicks, t = click_actions(pos2[0], pos2[1], move=(i==0), start=t)
+                actions += clicks
+                if i > 0: t += 0.2
             
-            pydirectinput.press(menu_key)
-            time.sleep(1.0)
-            pydirectinput.press(slot1_key)
-            time.sleep(1.0)
+            actions += [Action(t, "press", (menu_key,)), Action(t + 1.0, "press", (slot1_key,)),
+                        Action(t + 2.0, "wait", ())]
+            setup = executor.submit(actions, name="stats_setup")
+            while not setup.done.is_set():
+                if not self.is_running() or self.wait(0.1):
+                    setup.cancel() # State changed mid-setup, drop the rest of the sequence
+                    break
+            if setup.cancelled.is_set():
+                self.log("Auto-punch setup interrupted.")
+                return
             
             self.log("Auto-punching mode ACTIVE. Punching (0.5s interval)...")
-            punch_start_time = time.time()
+            punch_start_time = self.clock.time()
             while self.is_running():
-                is_leave_v = is_image_visible("return_to_lobby_alone", self.app.config, confidence=0.7)
+                seen = self.latest()
+                is_leave_v = seen.visible("return_to_lobby_alone")
                 
                 # Phase 3: Punch interval changed to 0.5s (was 0.05s)
                 punch_interval = 60 if is_leave_v else 0.5
-                if time.time() - self.last_punch_time > punch_interval:
-                    pydirectinput.click()
+                if self.clock.time() - self.last_punch_time > punch_interval:
+                    punches = [Action(0.0, "click", ())]
                     if is_leave_v:
-                        time.sleep(0.2)
-                        pydirectinput.click()
-                    self.last_punch_time = time.time()
+                        punches.append(Action(0.2, "click", ()))
+                    executor.submit(punches, name="punch")
+                    self.last_punch_time = self.clock.time()
                 
-                if time.time() - punch_start_time > 120:
+                if self.clock.time() - punch_start_time > 120:
                     if random.random() < 0.2:
                         move_keys = [keys_cfg.get("forward", "w"), keys_cfg.get("left", "a"), 
                                      keys_cfg.get("backward", "s"), keys_cfg.get("right", "d")]
                         key = random.choice(move_keys)
-                        pydirectinput.keyDown(key)
-                        time.sleep(0.2)
-                        pydirectinput.keyUp(key)
+                        executor.submit(hold_actions(key, 0.2), name="move")
                 
-                if is_image_visible("open", self.app.config) or is_image_visible("continue", self.app.config):
+                if seen.visible("open") or seen.visible("continue"):
                     self.log("Match end detected via results screen.")
+                    executor.cancel_all()
                     break
                 
-                if is_leave_v and (time.time() - self.last_leave_click_time > 60):
-                    if self.app.config.get("match_mode") == "quick":
-                        if find_and_click("return_to_lobby_alone", self.app.config, self.is_running, self.log, clicks=2):
-                            self.last_leave_click_time = time.time()
+                if is_leave_v and (self.clock.time() - self.last_leave_click_time > 60):
+                    if self.config.get("match_mode") == "quick":
+                        if self.click("return_to_lobby_alone", seen, clicks=2):
+                            self.last_leave_click_time = self.clock.time()
                     else:
                         # Full Mode AFK Prevention: Click current pos
-                        pydirectinput.mouseDown()
-                        time.sleep(0.1)
-                        pydirectinput.mouseUp()
-                        self.last_leave_click_time = time.time()
+                        self.afk_click()
+                        self.last_leave_click_time = self.clock.time()
                 
-                time.sleep(0.05)
+                # Sleep until the next check or punch is due, whichever comes first
+                until_punch = self.last_punch_time + punch_interval - self.clock.time()
+                self.wait(max(0.01, min(self.scan.interval(), until_punch)))
         except Exception as e:
             self.log(f"Auto-punch Error: {e}", is_error=True)
 
     def handle_post_match(self):
+        end_reason, outcome = self.post_match()
+        self.record_match(end_reason, outcome)
+
+    @timed_phase("post_match")
+    def post_match(self):
+        """Opens the results and leaves the match; returns (end reason, outcome image or None)."""
         self.log("Post-match phase. Looking for 'Open' or 'Continue'...")
         self.app.update_status("MATCH ENDED", "purple")
+        self.enter_phase("post_match", RESULT_TARGETS)
         
         notification_sent = False
-        start_wait = time.time()
-        last_progress_time = time.time() # 2-minute failsafe timer
+        end_reason = "stopped"
+        attachment = None
+        start_wait = self.clock.time()
+        last_progress_time = self.clock.time() # 2-minute failsafe timer
         
         if self.match_start_time == 0:
-            self.match_start_time = time.time() - 60
+            self.match_start_time = self.clock.time() - 60
 
         while self.is_running():
             # Absolute timeout: 5 minutes max in post-match
-            if time.time() - start_wait > 300:
+            if self.clock.time() - start_wait > 300:
                 self.log("Results screen timeout. Returning to lobby.")
+                end_reason = "timeout"
+                self.dump_recording(end_reason)
                 break
             
             # Failsafe: If no progress (no buttons found) for 2 minutes (120s)
-            if time.time() - last_progress_time > 120:
+            if self.clock.time() - last_progress_time > 120:
                 self.log("Failsafe: No buttons detected for 2 minutes. Returning to Phase 1.")
+                end_reason = "failsafe"
+                self.dump_recording(end_reason)
                 break
 
-            # 1. Image Checks
-            is_open_v = is_image_visible("open", self.app.config)
-            is_continue_v = is_image_visible("continue", self.app.config)
-            is_leave_v = is_image_visible("return_to_lobby_alone", self.app.config, confidence=0.7)
+            # 1. Image Checks (one capture and one batch for all three)
+            seen = self.latest()
+            is_open_v = seen.visible("open")
+            is_continue_v = seen.visible("continue")
+            is_leave_v = seen.visible("return_to_lobby_alone")
 
             if is_open_v or is_continue_v or is_leave_v:
                 # We see a button, so we are not "stuck" in a black screen/unknown state
-                last_progress_time = time.time() 
+                last_progress_time = self.clock.time() 
 
             # 2. Capture and Send Notification
             if (is_continue_v or is_leave_v) and not notification_sent:
                 self.log("Continue screen detected! Sending Discord results...")
-                screenshot_path = "match_finish.png"
                 try:
-                    full_screenshot = pyautogui.screenshot()
-                    area = self.app.config.get("outcome_area")
-                    if area:
-                        cropped_img = full_screenshot.crop(area)
-                        cropped_img.save(screenshot_path)
-                    else:
-                        full_screenshot.save(screenshot_path)
+                    # Crop the outcome area from this tick's frame and encode it in memory
+                    cfg = self.config
+                    image = capture_area(cfg.get("outcome_area"), seen.frame)
+                    attachment = encode_image(image, cfg.get("outcome_format", "png"),
+                                              cfg.get("outcome_quality", 85), cfg.get("outcome_scale", 1.0),
+                                              name="match_finish")
                 except Exception as e:
                     self.log(f"Screenshot Error: {e}")
-                    screenshot_path = None
 
-                elapsed = int(time.time() - self.match_start_time)
+                elapsed = int(self.clock.time() - self.match_start_time)
                 if elapsed > 3600 or elapsed < 0: elapsed = 0 
                 
                 time_str = f"{elapsed // 60} min {elapsed % 60} sec"
                 msg = f"Queue #{self.app.match_count} Finish time: {time_str}"
                 
-                send_discord(self.app.config.get("discord_webhook"), msg, file_path=screenshot_path)
-                self.log(f"Discord results sent. Time: {time_str}")
+                send_discord(self.config.get("discord_webhook"), msg, file=attachment)
+                self.log(f"Discord results queued. Time: {time_str}")
                 notification_sent = True
-                time.sleep(1)
+                self.clock.sleep(1)
 
             # 3. Handle Clicking
             if is_open_v:
                 # If we see Open, click it and RESET the failsafe timer
-                if find_and_click("open", self.app.config, self.is_running, self.log, clicks=2):
-                    last_progress_time = time.time()
-                time.sleep(2)
+                if self.click("open", seen, clicks=2):
+                    last_progress_time = self.clock.time()
+                clicked_at = self.clock.time()
+                self.scan.expect(["continue", "return_to_lobby_alone"], 3)
+                self.wait(2, ["continue", "return_to_lobby_alone"])
+                # Screen changed after clicking, use a frame captured after the click
+                seen = self.vision.latest(after=clicked_at)
             
             if is_continue_v:
-                if find_and_click("continue", self.app.config, self.is_running, self.log, clicks=2):
+                if self.click("continue", seen, clicks=2):
                     self.log("Continue clicked. Exiting post-match.")
-                    time.sleep(4)
+                    end_reason = "continue"
+                    self.clock.sleep(4)
                     break
             
             if is_leave_v:
                 # Stronger Return to Lobby attempt
                 self.log("Attempting to click 'Return to Lobby'...")
-                if find_and_click("return_to_lobby_alone", self.app.config, self.is_running, self.log, clicks=3):
+                if self.click("return_to_lobby_alone", seen, clicks=3):
                     self.log("Return to Lobby clicked multiple times. Exiting.")
-                    time.sleep(4)
+                    end_reason = "lobby"
+                    self.clock.sleep(4)
                     break
             
-            time.sleep(2)
+            self.wait(self.scan.interval(), RESULT_TARGETS)
+
+        stats = capture_stats(reset=True)
+        gate = self.vision.gate
+        skipped = 100.0 * gate.skipped / max(1, gate.checked)
+        self.log(f"Vision: {stats['count']} screen captures this match ({stats['rate']:.2f}/s), "
+                 f"matching skipped on {skipped:.0f}% unchanged frames")
+        return end_reason, attachment
@@ -1,29 +1,213 @@
 import time
 import random
-import pydirectinput
+import threading
+from collections import deque, namedtuple
+from src.core import backends
+from src.utils.metrics import metrics
+
+# at: seconds after the sequence starts; kind: an input sink method name, or "wait" (no input)
+Action = namedtuple("Action", "at kind args")
+
+def click_actions(x, y, move=True, start=0.0):
+    """The human_click timeline: smooth move, small left wiggle, held click."""
+    actions = []
+    t = start
+    if move:
+        duration = random.uniform(0.3, 0.5)
+        actions.append(Action(t, "move_to", (int(x), int(y), duration)))
+        t += duration + 0.3
+        actions.append(Action(t, "move_rel", (-random.randint(3, 6), 0)))
+        t += 0.2
+    actions.append(Action(t, "mouse_down", ()))
+    t += random.uniform(0.1, 0.2)
+    actions.append(Action(t, "mouse_up", ()))
+    return actions, t + 0.3
+
+def hold_actions(key, duration, start=0.0):
+    return [Action(start, "key_down", (key,)), Action(start + duration, "key_up", (key,))]
+
+_local = threading.local()
+_CALLER = object() # cancel_all() default: the calling thread's target
+ALL = object() # cancel_all(ALL): every target
+
+def use_target(target):
+    """Sets the input target for sequences submitted from the calling thread.
+
+    A target has an activate() method (e.g. bringing its game window to the front); the
+    executor calls it before the first sequence of a different target. One per bot thread.
+    """
+    _local.target = target
+
+class Sequence:
+    """Handle of a submitted action sequence."""
+    def __init__(self, actions, name, target=None):
+        self.actions = sorted(actions, key=lambda a: a.at)
+        self.name = name
+        self.target = target
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+class InputExecutor:
+    """Runs scheduled input sequences on a dedicated thread, on a monotonic-clock timeline.
+
+    The engine submits sequences (moves, presses, holds, click bursts) and keeps detecting
+    while they play. Sequences run one after another and can be cancelled when the game
+    state changes; keys and buttons still held are released on cancel. How late each
+    action fires is recorded in the input_jitter_seconds histogram.
+    Without a started thread, submit() plays the sequence inline on the backend clock.
+    Several engines (one per instance) share the thread: start() and stop() are counted,
+    and each engine only cancels the sequences of its own input target.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._current = None
+        self._active_target = None
+        self._thread = None
+        self._users = 0
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._cond:
+            self._users += 1
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="InputExecutor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Undoes one start(): cancels the caller's input, stops the thread after the last user."""
+        self.cancel_all()
+        with self._cond:
+            self._users = max(0, self._users - 1)
+            if self._users:
+                return
+            self._stop.set()
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def submit(self, actions, name="input", target=None):
+        sequence = Sequence(actions, name, target or getattr(_local, "target", None))
+        if not self.running:
+            self._play_inline(sequence)
+            return sequence
+        with self._cond:
+            self._queue.append(sequence)
+            self._cond.notify()
+        return sequence
+
+    def run(self, actions, name="input"):
+        """Submits a sequence and blocks until it has played (or was cancelled)."""
+        sequence = self.submit(actions, name)
+        sequence.wait()
+        return sequence
+
+    def cancel_all(self, target=_CALLER):
+        """Cancels the queued and playing sequences of `target` (default: the caller's, ALL: all)."""
+        if target is _CALLER:
+            target = getattr(_local, "target", None)
+        with self._cond:
+            kept = deque()
+            for sequence in self._queue:
+                if target is ALL or sequence.target is target:
+                    sequence.cancel()
+                    sequence.done.set()
+                else:
+                    kept.append(sequence)
+            self._queue = kept
+            if self._current is not None and (target is ALL or self._current.target is target):
+                self._current.cancel()
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._queue and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+                self._current = self._queue.popleft()
+            try:
+                self._play(self._current)
+            finally:
+                with self._cond:
+                    self._current.done.set()
+                    self._current = None
+
+    def _activate(self, target):
+        if target is not None and target is not self._active_target:
+            target.activate()
+        self._active_target = target
+
+    def _play(self, sequence):
+        sink = backends.sink()
+        held = []
+        self._activate(sequence.target)
+        started = time.monotonic()
+        try:
+            for action in sequence.actions:
+                # Event.wait doubles as a cancellable sleep until the action is due
+                if sequence.cancelled.wait(max(0.0, started + action.at - time.monotonic())):
+                    return
+                metrics.observe("input_jitter_seconds", max(0.0, time.monotonic() - started - action.at))
+                self._apply(sink, action, held)
+        finally:
+            self._release(sink, held)
+
+    def _play_inline(self, sequence):
+        clock, sink = backends.clock(), backends.sink()
+        held = []
+        self._activate(sequence.target)
+        started = clock.time()
+        try:
+            for action in sequence.actions:
+                clock.sleep(started + action.at - clock.time())
+                self._apply(sink, action, held)
+        finally:
+            self._release(sink, held)
+            sequence.done.set()
+
+    @staticmethod
+    def _apply(sink, action, held):
+        if action.kind == "wait":
+            return
+        getattr(sink, action.kind)(*action.args)
+        if action.kind in ("key_down", "mouse_down"):
+            held.append(action)
+        elif action.kind == "key_up":
+            held[:] = [a for a in held if not (a.kind == "key_down" and a.args == action.args)]
+        elif action.kind == "mouse_up":
+            held[:] = [a for a in held if a.kind != "mouse_down"]
+
+    @staticmethod
+    def _release(sink, held):
+        # Never leave a key or button stuck down after a cancelled sequence
+        for action in reversed(held):
+            if action.kind == "key_down":
+                sink.key_up(*action.args)
+            else:
+                sink.mouse_up()
+        held.clear()
+
+executor = InputExecutor()
 
 def human_click(x, y, is_running_check, move=True, offset=0):
     """Moves mouse smoothly and clicks exactly at target x, y with a small pre-click wiggle."""
     if not is_running_check():
         return
-    
-    if move:
-        # Move to EXACT position (no randomization)
-        pydirectinput.moveTo(int(x), int(y), duration=random.uniform(0.3, 0.5))
-        time.sleep(0.3)
-        
-        # Wiggle slightly to the left (as requested)
-        pydirectinput.moveRel(-random.randint(3, 6), 0, relative=True)
-        time.sleep(0.2)
-        
-        # Deliberate click and hold
-        pydirectinput.mouseDown()
-        time.sleep(random.uniform(0.1, 0.2))
-        pydirectinput.mouseUp()
-    else:
-        # Just click and hold at current position
-        pydirectinput.mouseDown()
-        time.sleep(random.uniform(0.1, 0.2))
-        pydirectinput.mouseUp()
-    
-    time.sleep(0.3)
+
+    actions, end = click_actions(x, y, move)
+    # The trailing wait keeps the 0.3s settle time after the click inside the sequence
+    executor.run(actions + [Action(end, "wait", ())], name="human_click")
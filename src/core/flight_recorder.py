@@ -0,0 +1,114 @@
+import io
+import os
+import re
+import json
+import time
+import threading
+from collections import deque, namedtuple
+from PIL import Image
+
+RECORD_DIR = "flight_records"
+
+# jpeg: the downscaled frame; scores: name -> [score, [left, top, width, height] or None]
+RecordedFrame = namedtuple("RecordedFrame", "timestamp jpeg scores")
+
+class FlightRecorder:
+    """Keeps the last few seconds of detection frames in memory, dumped when something fails.
+
+    record() runs on the detection path and only hands the latest frame and its scores
+    over (at most recorder_fps per second; frames arriving while one is still pending
+    replace it). A background thread downscales and JPEG-compresses them into a ring
+    that keeps recorder_seconds of history within recorder_max_mb. dump() writes the
+    ring and the scores to RECORD_DIR, also on a background thread.
+    """
+    QUALITY = 60
+
+    def __init__(self, log=None, directory=RECORD_DIR):
+        self.log = log or (lambda msg, is_error=False: None)
+        self.directory = directory
+        self._cond = threading.Condition()
+        self._frames = deque()
+        self._bytes = 0
+        self._pending = None
+        self._last = 0.0
+        self._thread = None
+        self._settings = (0.0, 0, 1.0) # seconds, byte cap, scale
+
+    def record(self, seen):
+        """Offers one Detections (frame and scores) to the recorder; returns immediately."""
+        config = seen.config
+        seconds = config.get("recorder_seconds", 30)
+        fps = config.get("recorder_fps", 2)
+        timestamp = seen.frame.timestamp
+        if seconds <= 0 or fps <= 0 or timestamp - self._last < 1.0 / fps:
+            return
+        self._last = timestamp
+        with self._cond:
+            self._settings = (seconds, int(config.get("recorder_max_mb", 16) * 1024 * 1024),
+                              config.get("recorder_scale", 0.5))
+            self._pending = (seen.frame, dict(seen))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="FlightRecorder", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _compress(self, frame, scale):
+        image = frame.image.convert("RGB")
+        if scale < 1.0:
+            size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+            image = image.resize(size, Image.Resampling.BILINEAR)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=self.QUALITY)
+        return buffer.getvalue()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                (frame, results), self._pending = self._pending, None
+                seconds, cap, scale = self._settings
+            try:
+                jpeg = self._compress(frame, scale)
+            except Exception as e:
+                self.log(f"Flight recorder: frame skipped ({e})", is_error=True)
+                continue
+            scores = {name: [round(float(score), 3), [int(v) for v in box] if box else None]
+                      for name, (score, box) in results.items()}
+            with self._cond:
+                self._frames.append(RecordedFrame(frame.timestamp, jpeg, scores))
+                self._bytes += len(jpeg)
+                # Age and memory limits, the newest frame always wins
+                while self._frames and (self._bytes > cap or
+                                        frame.timestamp - self._frames[0].timestamp > seconds):
+                    self._bytes -= len(self._frames.popleft().jpeg)
+
+    def dump(self, reason, label=""):
+        """Writes the recorded frames and their scores to a new folder under the directory."""
+        with self._cond:
+            frames = list(self._frames)
+        if not frames:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        label = re.sub(r"\W+", "_", label)
+        name = f"{stamp}_{label}_{reason}" if label else f"{stamp}_{reason}"
+        path = os.path.join(self.directory, name)
+        threading.Thread(target=self._write, args=(path, reason, frames), daemon=True).start()
+        self.log(f"Flight recorder: {len(frames)} frame(s) before '{reason}' saved to {path}")
+        return path
+
+    def _write(self, path, reason, frames):
+        index = []
+        try:
+            os.makedirs(path, exist_ok=True)
+            for number, recorded in enumerate(frames):
+                file_name = f"frame_{number:03d}.jpg"
+                with open(os.path.join(path, file_name), "wb") as f:
+                    f.write(recorded.jpeg)
+                index.append({"file": file_name, "timestamp": recorded.timestamp,
+                              "age": round(frames[-1].timestamp - recorded.timestamp, 2),
+                              "scores": recorded.scores})
+            with open(os.path.join(path, "scores.json"), "w", encoding="utf-8") as f:
+                json.dump({"reason": reason, "frames": index}, f, indent=1)
+        except OSError as e:
+            self.log(f"Flight recorder: dump to {path} failed ({e})", is_error=True)
@@ -0,0 +1,160 @@
+import os
+import re
+import time
+import threading
+from src.core.vision import grab_frame
+from src.core.bot_engine import BotEngine
+from src.utils.config import Config, load_config, validate
+
+class SharedCapture:
+    """Captures for every bot instance on one shared tick.
+
+    An instance whose scan is due calls grab() and joins the next tick (every `interval`
+    seconds); instances that are not due add nothing. The first caller of a tick waits
+    for it and captures once for everyone who joined: the bounding box of their regions,
+    or the full screen if one of them watches all of it. Each caller gets a crop of its
+    region; the crops share the capture's grayscale conversion.
+    """
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._tick = None # Tick still taking callers
+        self._regions = [] # Regions requested for it, None for the full screen
+        self._results = {} # tick -> [frame or exception, callers still to collect it]
+
+    @staticmethod
+    def _bounds(regions):
+        if not regions or None in regions:
+            return None
+        return [min(r[0] for r in regions), min(r[1] for r in regions),
+                max(r[2] for r in regions), max(r[3] for r in regions)]
+
+    def grab(self, region=None):
+        with self._cond:
+            leader = self._tick is None
+            if leader:
+                self._tick = int(time.time() // self.interval) + 1
+            tick = self._tick
+            self._regions.append(list(region) if region else None)
+            if leader:
+                while time.time() < tick * self.interval:
+                    self._cond.wait(tick * self.interval - time.time())
+                regions, self._tick, self._regions = self._regions, None, []
+        if leader:
+            try:
+                result = grab_frame(self._bounds(regions))
+            except Exception as e: # Raised to every caller of the tick
+                result = e
+            with self._cond:
+                self._results[tick] = [result, len(regions)]
+                self._cond.notify_all()
+        with self._cond:
+            while tick not in self._results:
+                self._cond.wait()
+            entry = self._results[tick]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._results[tick]
+        if isinstance(entry[0], Exception):
+            raise entry[0]
+        return entry[0].crop(region) if region else entry[0]
+
+    def grabber(self, region):
+        return lambda: self.grab(region)
+
+class WindowTarget:
+    """Input target of one instance: brings its game window to the front before input.
+
+    Windows are looked up by title (and index among windows with that title) through
+    pygetwindow, which ships with pyautogui on Windows. Without it activation is skipped;
+    clicks still land at the right screen position and focus the window themselves.
+    """
+    def __init__(self, title, index=0):
+        self.title = title
+        self.index = index
+
+    def window(self):
+        try:
+            import pygetwindow
+        except ImportError:
+            return None
+        try:
+            windows = pygetwindow.getWindowsWithTitle(self.title)
+        except Exception:
+            return None
+        return windows[self.index] if len(windows) > self.index else None
+
+    def region(self):
+        window = self.window()
+        if window is None:
+            return None
+        return [window.left, window.top, window.left + window.width, window.top + window.height]
+
+    def activate(self):
+        window = self.window()
+        if window is not None:
+            try:
+                window.activate()
+            except Exception:
+                pass
+
+class BotInstance:
+    """One bot of multi-instance mode: its own config, match count, region and input target.
+
+    Stands in for SCGMAutoBR towards its BotEngine. Logs and status go to the main app,
+    prefixed with the instance name; the run flag is the app's.
+    """
+    def __init__(self, app, spec, capture):
+        self.app = app
+        self.name = spec["name"]
+        self.config = instance_config(app.config, spec.get("config") or config_path(self.name))
+        self.match_count = 0
+
+        window = spec.get("window")
+        self.target = WindowTarget(window, spec.get("window_index", 0)) if window else None
+        self.region = spec.get("region") or (self.target.region() if self.target else None)
+        grab = capture.grabber(self.region) if self.region else capture.grab
+        self.engine = BotEngine(self, grab=grab, target=self.target)
+        for problem in self.config.problems:
+            self.log(problem, is_error=True)
+        if not self.region:
+            self.log(f"Window '{window}' not found, watching the full screen.", is_error=True)
+
+    @property
+    def is_running(self):
+        return self.app.is_running
+
+    def log(self, msg, is_error=False):
+        self.app.log(f"[{self.name}] {msg}", is_error)
+
+    def update_status(self, text, color):
+        self.app.update_status(text, color, label=f"{self.name}: {text}")
+
+    def update_match_count(self):
+        self.app.match_count = sum(instance.match_count for instance in self.app.instances)
+        self.app.update_match_count()
+
+def config_path(name):
+    return "config_" + re.sub(r"\W+", "_", name.strip().lower()) + ".json"
+
+def instance_config(main_config, path):
+    """The instance's own config file, seeded from the main config when it does not exist yet.
+
+    Positions and areas (pos_1, pos_2, outcome_area, rois) are screen coordinates, so a
+    seeded file still needs them picked for the instance's window.
+    """
+    if os.path.exists(path):
+        return load_config(path)
+    values, _ = validate({k: v for k, v in main_config.snapshot().items() if k != "instances"})
+    config = Config(values, path)
+    config.save()
+    return config
+
+def create_instances(app):
+    """BotInstances for config["instances"]; an empty list means single-instance mode."""
+    specs = app.config.get("instances", [])
+    if not specs:
+        return []
+    interval = 1.0 / max(0.1, app.config.get("vision_fps", 10))
+    capture = SharedCapture(interval)
+    return [BotInstance(app, spec, capture) for spec in specs]
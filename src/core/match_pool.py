@@ -0,0 +1,132 @@
+import time
+import atexit
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from src.core import vision, template_pack
+
+# Config keys the worker processes need to match
+MATCH_KEYS = ("images", "rois", "thresholds", "confidence", "match_engine", "pyramid_scale")
+
+# Worker process side: attached shared memory blocks and the last frame built on each
+_attached = {}
+_frames = {}
+
+def _attach(block):
+    if block not in _attached:
+        try:
+            _attached[block] = shared_memory.SharedMemory(name=block, track=False)
+        except TypeError: # Python < 3.13 has no track argument
+            _attached[block] = shared_memory.SharedMemory(name=block)
+    return _attached[block]
+
+def _worker_frame(block, shape, seq, origin, timestamp):
+    # Every template of one detect_all call shares the frame and its pyramid levels
+    cached = _frames.get(block)
+    if cached is not None and cached[0] == seq:
+        return cached[1]
+    gray = np.ndarray(shape, np.uint8, buffer=_attach(block).buf)
+    frame = vision.Frame.from_gray(gray, timestamp, origin)
+    _frames[block] = (seq, frame)
+    return frame
+
+def _init_worker():
+    # Workers read the compiled pack but leave writing it to the app process
+    vision.templates.pack = template_pack.TemplatePack(save=False)
+
+def _match(block, shape, seq, origin, timestamp, img_name, config, conf, learned):
+    """Runs in a worker process: one template against the frame in shared memory."""
+    start = time.perf_counter()
+    frame = _worker_frame(block, shape, seq, origin, timestamp)
+    found = vision.search_template(frame, img_name, config, conf, learned)
+    return found, time.perf_counter() - start
+
+class MatchPool:
+    """Template matching in worker processes, so matching never holds the UI's GIL.
+
+    The grayscale frame is copied once into a shared memory block that the workers map
+    directly; only the template name, a few config keys and the result are pickled.
+    Blocks are reused between calls and one is in use per concurrent detect call.
+    Learned search regions stay in this process and are sent along with each task.
+    """
+    def __init__(self, processes):
+        self.processes = processes
+        self._executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker)
+        self._lock = threading.Lock()
+        self._free = []
+        self._blocks = []
+        self._seq = 0
+
+    def _acquire(self, size):
+        with self._lock:
+            self._seq += 1
+            for block in self._free:
+                if block.size >= size:
+                    self._free.remove(block)
+                    return block, self._seq
+            block = shared_memory.SharedMemory(create=True, size=size)
+            self._blocks.append(block)
+            return block, self._seq
+
+    def _release(self, block):
+        with self._lock:
+            self._free.append(block)
+
+    def detect(self, frame, names, config):
+        """name -> (score, Box) for every name, like the in-process detect_all."""
+        gray = frame.gray
+        block, seq = self._acquire(gray.nbytes)
+        try:
+            np.ndarray(gray.shape, np.uint8, buffer=block.buf)[:] = gray
+            subset = {key: config[key] for key in MATCH_KEYS if key in config}
+            pending = []
+            for name in names:
+                conf = vision.confidence_for(name, config)
+                learned = vision.regions.search_region(name, frame.origin)
+                future = self._executor.submit(_match, block.name, gray.shape, seq, frame.origin,
+                                               frame.timestamp, name, subset, conf, learned)
+                pending.append((name, conf, future))
+
+            results = {}
+            for name, conf, future in pending:
+                found, seconds = future.result()
+                vision._record_check(name, found, conf, seconds)
+                vision._learn(frame, name, config, conf, found)
+                results[name] = found
+            return results
+        finally:
+            self._release(block)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            for block in self._blocks:
+                block.close()
+                block.unlink()
+            self._blocks.clear()
+            self._free.clear()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def pool_detect(frame, names, config):
+    """detect_all on the shared pool, (re)started with config["match_processes"] workers."""
+    global _pool
+    processes = int(config.get("match_processes", 0))
+    with _pool_lock:
+        if _pool is None or _pool.processes != processes:
+            if _pool is not None:
+                _pool.close()
+            _pool = MatchPool(processes)
+        pool = _pool
+    return pool.detect(frame, names, config)
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+atexit.register(shutdown)
@@ -0,0 +1,133 @@
+import time
+import threading
+from src.core import backends
+
+# phase: (fastest, slowest) poll interval in seconds
+PHASES = {
+    "lobby": (0.25, 2.0),
+    "match_waiting": (0.1, 1.0),
+    "in_game": (0.2, 1.5),
+    "auto_punch": (0.05, 0.5),
+    "post_match": (0.1, 2.0),
+}
+DEFAULT_PHASE = (0.1, 1.0)
+BACKOFF_DOUBLING = 5.0 # Seconds without a change for the poll interval to double
+MAX_SLOWDOWN = 4.0 # Over budget, intervals are stretched at most this much
+
+class ScanScheduler:
+    """Decides when the next check runs, per phase and per template.
+
+    Right after a phase transition or a template appearing/disappearing the phase polls at
+    its fastest interval; with nothing changing the interval doubles every BACKOFF_DOUBLING
+    seconds up to the phase's slowest. Templates the engine expects soon (expect()) stay at
+    the fastest interval until their window ends. When the process uses more CPU than
+    `cpu_budget` (fraction of one core, 0 = unlimited) every interval is stretched.
+    """
+    def __init__(self, cpu_budget=0.25):
+        self.cpu_budget = cpu_budget
+        self.phase = None
+        self.targets = None # None: no phase yet, check everything every tick
+        self.cpu_usage = 0.0
+        self.slowdown = 1.0
+        self.wakeup = threading.Event() # Set when the schedule changed; the worker re-plans
+
+        self._lock = threading.Lock()
+        self._entered = 0.0
+        self._changed = {} # name -> time it last appeared or disappeared
+        self._expected = {} # name -> end of its "expected soon" window
+        self._next = {} # name -> time it is due again
+        self._last_cpu = None
+
+    def enter(self, phase, targets):
+        """Switches to a phase; its templates are due immediately."""
+        now = backends.clock().time()
+        with self._lock:
+            self.phase = phase
+            self.targets = list(targets)
+            self._entered = now
+            for name in self.targets:
+                self._next[name] = now
+        self.wakeup.set()
+
+    def expect(self, names, within):
+        """Polls `names` at the fastest rate for the next `within` seconds."""
+        now = backends.clock().time()
+        with self._lock:
+            for name in names:
+                self._expected[name] = now + within
+                self._next[name] = now
+        self.wakeup.set()
+
+    def changed(self, name, timestamp):
+        """A template appeared or disappeared; poll fast again."""
+        with self._lock:
+            self._changed[name] = timestamp
+
+    def _limits(self):
+        return PHASES.get(self.phase, DEFAULT_PHASE)
+
+    def _backoff(self, since, now):
+        fastest, slowest = self._limits()
+        doublings = min(32.0, max(0.0, now - since) / BACKOFF_DOUBLING) # Capped, `since` may be 0
+        interval = fastest * 2 ** doublings
+        return min(slowest, interval) * self.slowdown
+
+    def _template_interval(self, name, now):
+        if self._expected.get(name, 0.0) > now:
+            return self._limits()[0] * self.slowdown
+        return self._backoff(max(self._entered, self._changed.get(name, 0.0)), now)
+
+    def interval(self):
+        """How long the engine waits between ticks of the current phase."""
+        now = backends.clock().time()
+        with self._lock:
+            names = self.targets or []
+            if any(self._expected.get(name, 0.0) > now for name in names):
+                return self._limits()[0] * self.slowdown
+            last = max([self._entered] + [self._changed.get(name, 0.0) for name in names])
+            return self._backoff(last, now)
+
+    def due(self, names, now):
+        """The subset of `names` to match on a frame captured at `now`."""
+        with self._lock:
+            if self.targets is None:
+                return list(names)
+            return [name for name in names if name in self.targets and self._next.get(name, 0.0) <= now]
+
+    def checked(self, names, now):
+        with self._lock:
+            for name in names:
+                self._next[name] = now + self._template_interval(name, now)
+
+    def next_due(self, now):
+        """Seconds until the earliest template of the phase is due."""
+        with self._lock:
+            if self.targets is None:
+                return 0.0
+            pending = [self._next.get(name, now) for name in self.targets]
+        return max(0.0, min(pending, default=now + self._limits()[1]) - now)
+
+    def account(self):
+        """Updates the process CPU usage (smoothed) and the resulting slowdown factor."""
+        wall, cpu = time.monotonic(), time.process_time()
+        if self._last_cpu is not None:
+            last_wall, last_cpu = self._last_cpu
+            if wall - last_wall > 0:
+                usage = (cpu - last_cpu) / (wall - last_wall)
+                self.cpu_usage = 0.8 * self.cpu_usage + 0.2 * usage
+        self._last_cpu = (wall, cpu)
+        if self.cpu_budget:
+            self.slowdown = min(MAX_SLOWDOWN, max(1.0, self.cpu_usage / self.cpu_budget))
+        else:
+            self.slowdown = 1.0
+
+    def reset(self):
+        with self._lock:
+            self.phase = None
+            self.targets = None
+            self._changed.clear()
+            self._expected.clear()
+            self._next.clear()
+            self._last_cpu = None
+            self.cpu_usage = 0.0
+            self.slowdown = 1.0
@@ -0,0 +1,168 @@
+import io
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+from PIL import Image
+from src.utils.config import ASSETS_DIR
+
+PACK_FILE = os.path.join(ASSETS_DIR, "templates.npz")
+PREVIEW_SIZE = (60, 60)
+
+class TemplatePack:
+    """Compiled templates: grayscale pixels, preview thumbnails and metadata in one .npz file.
+
+    Entries are keyed by config["images"] name and source path, so configs that map a
+    name to different files (e.g. per instance) each keep theirs. The manifest keeps the
+    source's mtime and SHA-1, the template size and the ROI and threshold it was last
+    synced with. A source whose mtime changed is hashed and only decoded again when its
+    contents changed too, so startup and the Assets tab read raw arrays instead of
+    decoding every PNG. With `path` None the pack lives in memory only (tools, tests);
+    with `save` False the file is read but never written (match worker processes).
+    """
+    def __init__(self, path=PACK_FILE, save=True):
+        self.path = path
+        self.save = save and path is not None
+        self._lock = threading.Lock()
+        self._manifest = None # (name, source) -> {"id", "mtime", "sha1", "size", "roi", "threshold"}
+        self._gray = {}
+        self._preview = {}
+        self._dirty = False
+
+    def _load(self):
+        if self._manifest is not None:
+            return
+        self._manifest = {}
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            manifest = {}
+            with np.load(self.path) as data:
+                for entry in json.loads(str(data["manifest"])):
+                    key = (entry.pop("name"), entry.pop("source"))
+                    manifest[key] = entry
+                    self._gray[key] = data[f"gray_{entry['id']}"]
+                    self._preview[key] = data[f"preview_{entry['id']}"]
+            self._manifest = manifest
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable or from an older layout: rebuilt from the sources on the next sync
+            self._gray.clear()
+            self._preview.clear()
+
+    def _current(self, key, mtime):
+        entry = self._manifest.get(key)
+        return entry is not None and entry["mtime"] == mtime
+
+    def _build(self, key, mtime):
+        """Brings one entry up to date with its source file; False when it cannot be decoded."""
+        with open(key[1], "rb") as f:
+            data = f.read()
+        sha1 = hashlib.sha1(data).hexdigest()
+        entry = self._manifest.get(key)
+        if entry is not None and entry["sha1"] == sha1:
+            entry["mtime"] = mtime # Touched but unchanged, nothing to decode
+            self._dirty = True
+            return True
+
+        import cv2 # Only needed to rebuild, reading the pack does not load OpenCV
+        gray = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            return False
+        thumb = Image.open(io.BytesIO(data)).convert("RGBA")
+        thumb.thumbnail(PREVIEW_SIZE)
+        self._gray[key] = gray
+        self._preview[key] = np.array(thumb)
+        # Array names in the .npz, derived from the key so they are valid file names
+        entry_id = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:16]
+        self._manifest[key] = {"id": entry_id, "mtime": mtime, "sha1": sha1,
+                               "size": [gray.shape[1], gray.shape[0]], "roi": None, "threshold": None}
+        self._dirty = True
+        return True
+
+    def _entry(self, key):
+        """Loads the pack, rebuilds the entry if its source changed. False when unavailable."""
+        try:
+            mtime = os.stat(key[1]).st_mtime_ns
+        except OSError:
+            return False
+        self._load()
+        if self._current(key, mtime):
+            return True
+        try:
+            return self._build(key, mtime)
+        except OSError:
+            return False
+
+    def template(self, name, path):
+        """The grayscale template of `name` from `path`, rebuilt (and saved) if it changed."""
+        with self._lock:
+            if not self._entry((name, path)):
+                return None
+            self._save()
+            return self._gray[(name, path)]
+
+    def preview(self, name, path):
+        """The RGBA preview thumbnail (at most PREVIEW_SIZE) of `name`, or None."""
+        with self._lock:
+            if not self._entry((name, path)):
+                return None
+            self._save()
+            return self._preview[(name, path)]
+
+    def sync(self, config):
+        """Brings every configured template up to date; returns the names that were rebuilt.
+
+        Entries of names the config no longer has, or whose source file is gone, are dropped.
+        """
+        rebuilt = []
+        with self._lock:
+            self._load()
+            for key in list(self._manifest):
+                if key[0] not in config["images"] or not os.path.exists(key[1]):
+                    del self._manifest[key], self._gray[key], self._preview[key]
+                    self._dirty = True
+            for name, path in config["images"].items():
+                key = (name, path)
+                old = self._manifest.get(key, {}).get("sha1")
+                if not self._entry(key):
+                    continue
+                entry = self._manifest[key]
+                if entry["sha1"] != old:
+                    rebuilt.append(name)
+                roi = config.get("rois", {}).get(name)
+                threshold = config.get("thresholds", {}).get(name, config.get("confidence"))
+                if entry["roi"] != (list(roi) if roi else None) or entry["threshold"] != threshold:
+                    entry["roi"], entry["threshold"] = list(roi) if roi else None, threshold
+                    self._dirty = True
+            self._save()
+        return rebuilt
+
+    def entries(self):
+        """Manifest copy: (name, source) -> metadata of every compiled template."""
+        with self._lock:
+            self._load()
+            return {key: dict(entry) for key, entry in self._manifest.items()}
+
+    def _save(self):
+        if not self._dirty or not self.save:
+            return
+        manifest = [{"name": key[0], "source": key[1], **entry} for key, entry in self._manifest.items()]
+        arrays = {"manifest": np.array(json.dumps(manifest))}
+        for key, entry in self._manifest.items():
+            arrays[f"gray_{entry['id']}"] = self._gray[key]
+            arrays[f"preview_{entry['id']}"] = self._preview[key]
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Per process temp name: several app instances may rebuild the same pack
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            pass # Read-only install: the in-memory entries still serve this run
+
+pack = TemplatePack()
@@ -1,44 +1,492 @@
+import io
 import os
-import pyautogui
+import time
+import threading
+from collections import namedtuple
+import numpy as np
+import cv2
 from PIL import Image, ImageTk
 import tkinter as tk
 from src.core.controller import human_click
+from src.core import backends
+from src.core import template_pack
+from src.ui.components import Magnifier, RedrawThrottle, photo_copy
+from src.utils.metrics import metrics
+
+# Capture accounting, used to compare captures/s before and after per-tick snapshots
+_capture_lock = threading.Lock()
+_capture_stats = {"count": 0, "since": time.time()}
+
+def _record_capture():
+    with _capture_lock:
+        _capture_stats["count"] += 1
+
+def capture_stats(reset=False):
+    """Returns the number of screen captures and captures/s since the last reset."""
+    with _capture_lock:
+        now = time.time()
+        elapsed = max(1e-6, now - _capture_stats["since"])
+        stats = {
+            "count": _capture_stats["count"],
+            "elapsed": elapsed,
+            "rate": _capture_stats["count"] / elapsed
+        }
+        if reset:
+            _capture_stats["count"] = 0
+            _capture_stats["since"] = now
+        return stats
+
+class Frame:
+    """A single screen capture shared by every template check in one bot tick.
+
+    `origin` is the screen position of the frame's top-left pixel: (0, 0) for a full
+    capture, the region's corner for a crop() of a shared capture.
+    """
+    def __init__(self, image, timestamp=None, origin=(0, 0)):
+        self._image = image
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self.origin = origin
+        self._parent = None
+        self._bounds = None
+        self._gray = None
+        self._scaled = {}
+
+    @property
+    def image(self):
+        if self._image is None and self._parent is not None:
+            self._image = self._parent.image.crop(self._bounds)
+        return self._image
+
+    @property
+    def gray(self):
+        # Grayscale conversion is done once per frame, not once per template
+        if self._gray is None:
+            if self._parent is not None:
+                # A view into the shared capture's grayscale, converted once for all crops
+                left, top, right, bottom = self._bounds
+                self._gray = self._parent.gray[top:bottom, left:right]
+            else:
+                self._gray = cv2.cvtColor(np.array(self.image.convert("RGB")), cv2.COLOR_RGB2GRAY)
+        return self._gray
+
+    @classmethod
+    def from_gray(cls, gray, timestamp, origin=(0, 0)):
+        """A frame known only by its grayscale pixels, e.g. in a match worker process."""
+        frame = cls(None, timestamp, origin)
+        frame._gray = gray
+        return frame
+
+    def crop(self, region):
+        """The (left, top, right, bottom) screen region of this frame as a Frame of its own."""
+        width, height = self._parent_size()
+        left = min(width, max(0, int(region[0]) - self.origin[0]))
+        top = min(height, max(0, int(region[1]) - self.origin[1]))
+        right = max(left, min(width, int(region[2]) - self.origin[0]))
+        bottom = max(top, min(height, int(region[3]) - self.origin[1]))
+        child = Frame(None, self.timestamp, (self.origin[0] + left, self.origin[1] + top))
+        child._parent = self
+        child._bounds = (left, top, right, bottom)
+        return child
+
+    def _parent_size(self):
+        if self._bounds is not None:
+            return self._bounds[2] - self._bounds[0], self._bounds[3] - self._bounds[1]
+        return self.image.width, self.image.height
+
+    def scaled(self, scale):
+        """Downscaled grayscale frame, computed once per scale."""
+        if scale not in self._scaled:
+            self._scaled[scale] = cv2.resize(self.gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return self._scaled[scale]
+
+def grab_frame(region=None):
+    """Captures the screen, or only its (left, top, right, bottom) region, once.
+
+    Pass the result to every check of the same tick.
+    """
+    origin, box = (0, 0), None
+    if region:
+        left, top, right, bottom = [int(v) for v in region]
+        origin, box = (left, top), (left, top, right - left, bottom - top)
+    with metrics.timer("vision_capture_seconds"):
+        image = backends.source().grab(region=box)
+    _record_capture()
+    return Frame(image, backends.clock().time(), origin)
+
+def capture_area(area=None, frame=None):
+    """Image of (left, top, right, bottom), cropped from `frame` when it covers the area.
+
+    Otherwise only that region is captured from the screen, never the full screen.
+    Without an area the whole frame (or a fresh capture) is returned.
+    """
+    if not area:
+        return frame.image if frame is not None else backends.source().grab()
+    left, top, right, bottom = [int(v) for v in area]
+    if frame is not None:
+        # The area is in screen coordinates, the frame may be a crop starting elsewhere
+        x, y = left - frame.origin[0], top - frame.origin[1]
+        w, h = right - left, bottom - top
+        if x >= 0 and y >= 0 and x + w <= frame.image.width and y + h <= frame.image.height:
+            return frame.image.crop((x, y, x + w, y + h))
+    return backends.source().grab(region=(left, top, right - left, bottom - top))
+
+IMAGE_FORMATS = {"png": ("PNG", "image/png"), "jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+
+def encode_image(image, fmt="png", quality=85, scale=1.0, name="screenshot"):
+    """Encodes an image in memory for upload. Returns (bytes, file name, mime type).
+
+    PNG is written with optimize; JPEG and WebP use `quality`. `scale` < 1 downscales first.
+    """
+    fmt = fmt.lower() if fmt.lower() in IMAGE_FORMATS else "png"
+    pil_format, mime = IMAGE_FORMATS[fmt]
+    if scale and scale < 1.0:
+        size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        image = image.resize(size, Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    if fmt == "png":
+        image.save(buffer, pil_format, optimize=True)
+    else:
+        image.convert("RGB").save(buffer, pil_format, quality=int(quality))
+    return buffer.getvalue(), f"{name}.{'jpg' if fmt == 'jpeg' else fmt}", mime
+
+class FrameGate:
+    """Cheap change detector: tells whether a frame differs enough from the last matched one.
+
+    Frames are reduced to a small grid of cell averages; if no cell moved by more than
+    `threshold` gray levels, the previous detections can be reused. A full match is still
+    forced every `max_age` seconds.
+    """
+    GRID = (128, 72)
+
+    def __init__(self, threshold=6, max_age=5.0):
+        self.threshold = threshold
+        self.max_age = max_age
+        self._reference = None
+        self._reference_time = 0
+        self.checked = 0
+        self.skipped = 0
+
+    def changed(self, frame):
+        thumb = cv2.resize(frame.gray, self.GRID, interpolation=cv2.INTER_AREA)
+        self.checked += 1
+        if (self._reference is not None and frame.timestamp - self._reference_time < self.max_age
+                and cv2.absdiff(thumb, self._reference).max() <= self.threshold):
+            self.skipped += 1
+            return False
+        self._reference = thumb
+        self._reference_time = frame.timestamp
+        return True
+
+    def reset(self):
+        self._reference = None
+        self.checked = 0
+        self.skipped = 0
+
+class TemplateCache:
+    """Decoded grayscale templates keyed by config["images"] name.
+
+    Each asset is read once from the compiled template pack and kept in memory. The file
+    mtime is re-checked at most every STAT_INTERVAL seconds and the template is reloaded
+    only when it changed; the pack decodes the source again only if its contents did.
+    Tools that match throwaway templates swap `pack` for an in-memory TemplatePack(None).
+    """
+    STAT_INTERVAL = 1.0
+
+    def __init__(self, pack=None):
+        self.pack = pack or template_pack.pack
+        self._lock = threading.Lock()
+        self._entries = {} # name -> {"path", "mtime", "checked", "image"}
+
+    def get(self, img_name, config):
+        path = config["images"].get(img_name)
+        if not path:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(img_name)
+            if entry and entry["path"] == path and now - entry["checked"] < self.STAT_INTERVAL:
+                return entry["image"]
+
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self.invalidate(img_name)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(img_name)
+            if entry and entry["path"] == path and entry["mtime"] == mtime:
+                entry["checked"] = now
+                return entry["image"]
+
+        image = self.pack.template(img_name, path)
+        with self._lock:
+            self._entries[img_name] = {"path": path, "mtime": mtime, "checked": now, "image": image}
+        return image
+
+    def scaled(self, img_name, config, scale):
+        """The template downscaled for pyramid matching, cached next to the original."""
+        image = self.get(img_name, config)
+        if image is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(img_name)
+            cache = entry.setdefault("scaled", {}) if entry else {}
+            if scale not in cache:
+                cache[scale] = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            return cache[scale]
+
+    def invalidate(self, img_name=None):
+        """Drops one cached template (or all of them) so the next check reloads it."""
+        with self._lock:
+            if img_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(img_name, None)
+
+templates = TemplateCache()
+
+Box = namedtuple("Box", "left top width height")
+
+class HitRegions:
+    """Remembers where each template last matched so the next search can start there.
+
+    Hits are kept per frame origin, so bots watching different screen regions each
+    learn their own positions.
+    """
+    PADDING = 40 # Extra pixels searched around the last hit
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hits = {} # name -> {origin: Box}
+
+    def get(self, img_name, origin=(0, 0)):
+        with self._lock:
+            return self._hits.get(img_name, {}).get(origin)
+
+    def remember(self, img_name, box, origin=(0, 0)):
+        with self._lock:
+            self._hits.setdefault(img_name, {})[origin] = box
+
+    def forget(self, img_name=None):
+        with self._lock:
+            if img_name is None:
+                self._hits.clear()
+            else:
+                self._hits.pop(img_name, None)
+
+    def search_region(self, img_name, origin=(0, 0)):
+        """Padded (left, top, right, bottom) around the last hit, or None."""
+        box = self.get(img_name, origin)
+        if box is None:
+            return None
+        return (box.left - self.PADDING, box.top - self.PADDING,
+                box.left + box.width + self.PADDING, box.top + box.height + self.PADDING)
+
+regions = HitRegions()
+
+def _match_full(gray, template):
+    """Best full-resolution normalized cross-correlation match as (score, Box), or None."""
+    th, tw = template.shape[:2]
+    if gray.shape[0] < th or gray.shape[1] < tw:
+        return None
+    result = cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED)
+    _, score, _, loc = cv2.minMaxLoc(result)
+    return score, Box(loc[0], loc[1], tw, th)
+
+# Pyramid engine tuning
+PYRAMID_SLACK = 0.15 # Coarse scores run lower than full-res ones, so accept weaker candidates
+PYRAMID_CANDIDATES = 3 # Coarse peaks refined at full resolution
+PYRAMID_MIN_SIZE = 12 # Templates smaller than this once scaled use the full engine
+
+def _match_pyramid(frame, img_name, template, config, conf):
+    """Coarse-to-fine match: search the downscaled frame, refine the best peaks at full res."""
+    scale = config.get("pyramid_scale", 0.5)
+    small = templates.scaled(img_name, config, scale)
+    if small is None or min(small.shape[:2]) < PYRAMID_MIN_SIZE:
+        return _match_full(frame.gray, template)
+
+    coarse = frame.scaled(scale)
+    sh, sw = small.shape[:2]
+    if coarse.shape[0] < sh or coarse.shape[1] < sw:
+        return None
+    result = cv2.matchTemplate(coarse, small, cv2.TM_CCOEFF_NORMED)
+
+    th, tw = template.shape[:2]
+    pad = int(np.ceil(1 / scale)) + 2
+    best = None
+    for _ in range(PYRAMID_CANDIDATES):
+        _, coarse_score, _, loc = cv2.minMaxLoc(result)
+        if best is not None and coarse_score < conf - PYRAMID_SLACK:
+            break
+
+        # Refine inside a small full-resolution window around the candidate
+        left = max(0, int(loc[0] / scale) - pad)
+        top = max(0, int(loc[1] / scale) - pad)
+        window = frame.gray[top:top + th + 2 * pad, left:left + tw + 2 * pad]
+        refined = _match_full(window, template)
+        if refined:
+            score, box = refined
+            if best is None or score > best[0]:
+                best = (score, Box(box.left + left, box.top + top, tw, th))
+
+        # Suppress this peak so the next iteration finds a different one
+        result[max(0, loc[1] - sh // 2):loc[1] + sh // 2 + 1, max(0, loc[0] - sw // 2):loc[0] + sw // 2 + 1] = -1
+    return best
+
+def _search(frame, img_name, template, config, conf, region=None):
+    """(score, Box) of the best match in the whole frame or inside (left, top, right, bottom)."""
+    if region is None:
+        if config.get("match_engine", "full") == "pyramid":
+            return _match_pyramid(frame, img_name, template, config, conf)
+        return _match_full(frame.gray, template)
+
+    # Regions are small, full resolution is already cheap there
+    height, width = frame.gray.shape[:2]
+    left, top = max(0, int(region[0])), max(0, int(region[1]))
+    right, bottom = min(width, int(region[2])), min(height, int(region[3]))
+    found = _match_full(frame.gray[top:bottom, left:right], template)
+    if found is None:
+        return None
+    score, box = found
+    return score, Box(box.left + left, box.top + top, box.width, box.height)
+
+def confidence_for(img_name, config, confidence=None):
+    """Threshold for one template: explicit value, then config["thresholds"], then the global one."""
+    if confidence is not None:
+        return confidence
+    return config.get("thresholds", {}).get(img_name, config["confidence"])
+
+MISS = (-1.0, None)
+
+def _record_check(img_name, found, conf, seconds):
+    metrics.observe("vision_check_seconds", seconds, template=img_name)
+    metrics.inc("vision_checks_total", template=img_name, result="hit" if found[0] >= conf else "miss")
+
+def _detect(frame, img_name, config, conf):
+    """(score, Box) of one template in the frame, timed and counted as a hit or miss."""
+    start = time.perf_counter()
+    found = _detect_template(frame, img_name, config, conf)
+    _record_check(img_name, found, conf, time.perf_counter() - start)
+    return found
+
+def _detect_template(frame, img_name, config, conf):
+    """(score, Box) of one template in the frame, honouring pinned and learned ROIs."""
+    found = search_template(frame, img_name, config, conf, regions.search_region(img_name, frame.origin))
+    _learn(frame, img_name, config, conf, found)
+    return found
+
+def _learn(frame, img_name, config, conf, found):
+    """Remembers a hit as the next search region (pinned templates don't need one)."""
+    if found[1] is not None and found[0] >= conf and not config.get("rois", {}).get(img_name):
+        regions.remember(img_name, found[1], frame.origin)
+
+def search_template(frame, img_name, config, conf, learned=None):
+    """(score, Box) of one template: inside its pinned ROI, else around `learned`, then everywhere.
+
+    Does not touch the learned regions, so it can also run in a match worker process.
+    """
+    template = templates.get(img_name, config)
+    if template is None:
+        return MISS
 
-def is_image_visible(img_name, config, confidence=None):
-    """Checks if an image is on screen without clicking it."""
-    path = config["images"].get(img_name)
-    if not path or not os.path.exists(path):
-        return False
-        
-    conf = confidence if confidence is not None else config["confidence"]
     try:
-        return pyautogui.locateOnScreen(path, confidence=conf, grayscale=True) is not None
+        pinned = config.get("rois", {}).get(img_name)
+        if pinned:
+            # Pinned ROIs are in screen coordinates
+            ox, oy = frame.origin
+            pinned = (pinned[0] - ox, pinned[1] - oy, pinned[2] - ox, pinned[3] - oy)
+            return _search(frame, img_name, template, config, conf, pinned) or MISS
+
+        found = None
+        if learned:
+            found = _search(frame, img_name, template, config, conf, learned)
+        if not found or found[0] < conf:
+            found = _search(frame, img_name, template, config, conf)
+        return found or MISS
     except Exception:
-        return False
+        return MISS
+
+class Detections(dict):
+    """Result of detect_all: name -> (score, Box), with per-template threshold checks."""
+    def __init__(self, config, frame, results):
+        super().__init__(results)
+        self.config = config
+        self.frame = frame
+
+    def visible(self, img_name, confidence=None):
+        score, box = self.get(img_name, MISS)
+        return box is not None and score >= confidence_for(img_name, self.config, confidence)
+
+    def box(self, img_name, confidence=None):
+        return self[img_name][1] if self.visible(img_name, confidence) else None
 
-def find_and_click(img_name, config, is_running_check, log_func, clicks=1):
+def detect_all(frame, names, config):
+    """Evaluates every named template against one frame in a single call.
+
+    The grayscale frame and its pyramid levels are computed once and shared by all
+    templates. Returns Detections mapping each name to (score, Box or None).
+    With config["match_processes"] set, the templates are matched in worker processes.
+    """
+    if frame is None:
+        frame = grab_frame()
+    if config.get("match_processes", 0):
+        from src.core.match_pool import pool_detect
+        return Detections(config, frame, pool_detect(frame, names, config))
+    return Detections(config, frame, {
+        name: _detect(frame, name, config, confidence_for(name, config)) for name in names
+    })
+
+def locate(img_name, config, confidence=None, frame=None):
+    """Returns the match box of an image in the frame (or a fresh capture), or None.
+
+    A pinned ROI from config["rois"] restricts the search to that area. Otherwise the
+    area around the last hit is searched first, then the full frame on a miss.
+    """
+    if frame is None:
+        frame = grab_frame()
+    conf = confidence_for(img_name, config, confidence)
+    score, box = _detect(frame, img_name, config, conf)
+    return box if box is not None and score >= conf else None
+
+def is_image_visible(img_name, config, confidence=None, frame=None):
+    """Checks if an image is on screen without clicking it."""
+    return locate(img_name, config, confidence, frame) is not None
+
+def find_and_click(img_name, config, is_running_check, log_func, clicks=1, frame=None, detections=None):
     if not is_running_check():
         return False
     
-    path = config["images"].get(img_name)
-    if not path or not os.path.exists(path):
+    # Reuse a detect_all result (or at least its frame) when one is given
+    if detections is not None:
+        frame = detections.frame
+    if frame is None:
+        frame = grab_frame()
+    if detections is not None and img_name in detections:
+        pos = detections.box(img_name)
+    else:
+        pos = locate(img_name, config, frame=frame)
+    if not pos:
         return False
-        
+
     try:
-        pos = pyautogui.locateOnScreen(path, confidence=config["confidence"], grayscale=True)
-        if pos:
-            center = pyautogui.center(pos)
-            log_func(f"Found {img_name}!")
-            
-            # Calculate a safe offset (25% of the image size, max 8)
-            safe_offset_x = min(8, max(1, pos.width // 4))
-            safe_offset_y = min(8, max(1, pos.height // 4))
-            safe_offset = min(safe_offset_x, safe_offset_y)
-            
-            human_click(center.x, center.y, is_running_check, offset=safe_offset)
+        # Boxes are relative to the frame; clicks need screen coordinates
+        center_x = frame.origin[0] + pos.left + pos.width // 2
+        center_y = frame.origin[1] + pos.top + pos.height // 2
+        log_func(f"Found {img_name}!")
+        
+        # Calculate a safe offset (25% of the image size, max 8)
+        safe_offset_x = min(8, max(1, pos.width // 4))
+        safe_offset_y = min(8, max(1, pos.height // 4))
+        safe_offset = min(safe_offset_x, safe_offset_y)
+        
+        with metrics.timer("click_seconds", template=img_name):
+            human_click(center_x, center_y, is_running_check, offset=safe_offset)
             for _ in range(clicks - 1):
-                human_click(center.x, center.y, is_running_check, move=False)
-            return True
+                human_click(center_x, center_y, is_running_check, move=False)
+        return True
     except Exception:
         pass
     return False
@@ -62,79 +510,61 @@ class ScreenCaptureTool:
         enhancer = ImageEnhance.Brightness(self.screenshot)
         self.dimmed_screenshot = enhancer.enhance(0.4) # Darken to 40%
         self.tk_dimmed = ImageTk.PhotoImage(self.dimmed_screenshot)
+        self.tk_bright = ImageTk.PhotoImage(self.screenshot) # Converted once, spotlight and magnifier copy from it
         
         self.canvas = tk.Canvas(self.top, highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
         self.canvas.create_image(0, 0, anchor=tk.NW, image=self.tk_dimmed)
 
-        # Magnifier setup
-        self.mag_size = 180
-        self.mag_zoom = 4
-        self.mag_canvas = tk.Canvas(self.top, width=self.mag_size, height=self.mag_size, 
-                                     highlightthickness=2, highlightbackground="red")
+        # Fixed canvas items, moved and refilled on redraw instead of recreated
+        self.spotlight = tk.PhotoImage(master=self.canvas) # No fixed size: grows and shrinks with the selection
+        self.spotlight_item = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.spotlight, state=tk.HIDDEN)
+        self.rect = self.canvas.create_rectangle(0, 0, 0, 0, outline='red', width=1, state=tk.HIDDEN)
+        self.magnifier = Magnifier(self.top, self.tk_bright)
+        self.redraw = RedrawThrottle(self.top, self.draw)
         
         self.start_x = None
         self.start_y = None
-        self.rect = None
-        self.spotlight_item = None
+        self.dragging = False
         
         self.canvas.bind("<ButtonPress-1>", self.on_press)
-        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<B1-Motion>", self.redraw)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
-        self.canvas.bind("<Motion>", self.update_magnifier)
+        self.canvas.bind("<Motion>", self.redraw)
         self.top.bind("<Escape>", lambda e: self.top.destroy())
         
         self.canvas.create_text(20, 20, text=f"Capturing: {key.upper()} | Drag to snip. ESC to cancel.", 
                                 anchor=tk.NW, fill="white", font=("Segoe UI", 16, "bold"))
 
-    def update_magnifier(self, event):
+    def draw(self, event):
+        """One redraw for the latest mouse position: selection, spotlight and magnifier."""
         x, y = event.x, event.y
-        mag_x = x + 30 if x + self.mag_size + 60 < self.top.winfo_screenwidth() else x - self.mag_size - 30
-        mag_y = y + 30 if y + self.mag_size + 60 < self.top.winfo_screenheight() else y - self.mag_size - 30
-        self.mag_canvas.place(x=mag_x, y=mag_y)
-        
-        box_size = self.mag_size // self.mag_zoom
-        left = max(0, x - box_size // 2)
-        top = max(0, y - box_size // 2)
-        right = min(self.screenshot.width, left + box_size)
-        bottom = min(self.screenshot.height, top + box_size)
-        
-        part = self.screenshot.crop((left, top, right, bottom))
-        part = part.resize((self.mag_size, self.mag_size), Image.Resampling.NEAREST)
-        
-        self.photo = ImageTk.PhotoImage(part)
-        self.mag_canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
-        self.mag_canvas.create_line(self.mag_size//2, 0, self.mag_size//2, self.mag_size, fill="red")
-        self.mag_canvas.create_line(0, self.mag_size//2, self.mag_size, self.mag_size//2, fill="red")
+        if self.dragging:
+            self.canvas.coords(self.rect, self.start_x, self.start_y, x, y)
+            
+            # Spotlight effect: the original bright pixels inside the rectangle
+            left = min(self.start_x, x)
+            top = min(self.start_y, y)
+            right = max(self.start_x, x)
+            bottom = max(self.start_y, y)
+            
+            if right - left > 2 and bottom - top > 2:
+                photo_copy(self.spotlight, self.tk_bright, (left, top, right, bottom), shrink=True)
+                self.canvas.coords(self.spotlight_item, left, top)
+                self.canvas.itemconfigure(self.spotlight_item, state=tk.NORMAL)
+
+        self.magnifier.show(x, y)
 
     def on_press(self, event):
         self.start_x = event.x
         self.start_y = event.y
-        if self.rect: self.canvas.delete(self.rect)
-        if self.spotlight_item: self.canvas.delete(self.spotlight_item)
-        self.rect = self.canvas.create_rectangle(self.start_x, self.start_y, 1, 1, 
-                                                 outline='red', width=1)
-
-    def on_drag(self, event):
-        x, y = event.x, event.y
-        self.canvas.coords(self.rect, self.start_x, self.start_y, x, y)
-        
-        # Spotlight effect: Draw the original bright image in the rectangle
-        left = min(self.start_x, x)
-        top = min(self.start_y, y)
-        right = max(self.start_x, x)
-        bottom = max(self.start_y, y)
-        
-        if right - left > 2 and bottom - top > 2:
-            bright_part = self.screenshot.crop((left, top, right, bottom))
-            self.bright_tk = ImageTk.PhotoImage(bright_part)
-            if self.spotlight_item: self.canvas.delete(self.spotlight_item)
-            self.spotlight_item = self.canvas.create_image(left, top, anchor=tk.NW, image=self.bright_tk)
-            self.canvas.tag_raise(self.rect) # Keep red border on top
-
-        self.update_magnifier(event)
+        self.dragging = True
+        self.canvas.itemconfigure(self.spotlight_item, state=tk.HIDDEN)
+        self.canvas.coords(self.rect, self.start_x, self.start_y, event.x, event.y)
+        self.canvas.itemconfigure(self.rect, state=tk.NORMAL)
 
     def on_release(self, event):
+        self.dragging = False
         end_x, end_y = event.x, event.y
         left = min(self.start_x, end_x)
         top = min(self.start_y, end_y)
@@ -144,11 +574,14 @@ class ScreenCaptureTool:
         if right - left < 3 or bottom - top < 3:
             return
 
+        self.redraw.cancel()
         cropped = self.screenshot.crop((left, top, right, bottom))
         asset_name = f"{self.key}.png"
         save_path = os.path.join(self.assets_dir, asset_name)
         os.makedirs(self.assets_dir, exist_ok=True)
         cropped.save(save_path)
+        templates.invalidate(self.key)
+        regions.forget(self.key)
         
         self.result_path = save_path
         self.on_complete(self.result_path)
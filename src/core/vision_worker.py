@@ -0,0 +1,170 @@
+import time
+import threading
+from collections import deque, namedtuple
+from src.core import backends
+from src.core.vision import detect_all, grab_frame, Detections, FrameGate, MISS
+from src.core.scheduler import ScanScheduler
+from src.core.flight_recorder import FlightRecorder
+
+# kind is "appeared" or "disappeared"; timestamp is the capture time of the frame
+VisionEvent = namedtuple("VisionEvent", "seq name kind score box timestamp")
+
+class VisionWorker:
+    """Keeps capturing and matching on its own thread and publishes detection events.
+
+    The engine reads the latest Detections with latest() and blocks on wait_for()
+    instead of sleeping, so a target that appears mid-action is seen immediately.
+    Which templates are matched on a frame, and when the next frame is taken, is up to
+    the ScanScheduler; templates that are not due keep their previous result. Every
+    published result also goes to the flight recorder.
+    When the thread is not started, latest() detects synchronously on the caller's thread.
+    `grab` returns the Frame to check, by default a full screen capture.
+    """
+    def __init__(self, get_config, targets, log=None, grab=None):
+        self.get_config = get_config
+        self.targets = list(targets)
+        self.grab = grab or grab_frame
+        self.log = log or (lambda msg, is_error=False: None)
+        self.gate = FrameGate()
+        self.scheduler = ScanScheduler()
+        self.recorder = FlightRecorder(self.log)
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._latest = None
+        self._visible = {}
+        self._events = deque(maxlen=256)
+        self._seq = 0
+        self._stale = set() # Clicked templates, rechecked on the next frame
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        with self._cond:
+            self._latest = None
+            self._visible = {}
+        self.gate.reset()
+        self.scheduler.reset()
+        self._thread = threading.Thread(target=self._run, name="VisionWorker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.scheduler.wakeup.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.time()
+            config = self.get_config()
+            self.scheduler.cpu_budget = config.get("cpu_budget", 0.25)
+            self.scheduler.wakeup.clear()
+            try:
+                self._publish(self._detect(config))
+            except Exception as e:
+                self.log(f"Vision worker error: {e}", is_error=True)
+            self.scheduler.account()
+            # vision_fps caps the rate, the scheduler decides how long to idle beyond that
+            interval = 1.0 / max(0.1, config.get("vision_fps", 10))
+            delay = max(interval, self.scheduler.next_due(backends.clock().time()))
+            self.scheduler.wakeup.wait(max(0.0, delay - (time.time() - started)))
+
+    def _detect(self, config):
+        frame = self.grab()
+        previous = self._latest
+        targets = self.scheduler.targets or self.targets
+        with self._cond:
+            stale, self._stale = self._stale, set()
+        # Templates the phase needs but has no result for yet (just entered or clicked) are checked now
+        missing = [name for name in targets if previous is None or name not in previous or name in stale]
+        # Unchanged screen (lobby, loading): reuse the last results with the new frame
+        if config.get("frame_gate", True) and not missing and not self.gate.changed(frame):
+            # The due templates count as checked, so the backoff slows the captures down too
+            self.scheduler.checked(self.scheduler.due(targets, frame.timestamp), frame.timestamp)
+            return Detections(config, frame, previous)
+        if previous is None:
+            self.gate.changed(frame) # Seed the reference frame
+        scheduled = self.scheduler.due(targets, frame.timestamp)
+        due = [name for name in self.targets if name in missing or name in scheduled]
+        # Results of templates outside the phase are dropped rather than going stale
+        results = {name: found for name, found in (previous or {}).items() if name in targets}
+        results.update(detect_all(frame, due, config))
+        self.scheduler.checked(due, frame.timestamp)
+        return Detections(config, frame, results)
+
+    def _publish(self, seen):
+        with self._cond:
+            for name in self.targets:
+                visible = seen.visible(name)
+                if visible != self._visible.get(name, False):
+                    self.scheduler.changed(name, seen.frame.timestamp)
+                    self._seq += 1
+                    score, box = seen.get(name, MISS)
+                    kind = "appeared" if visible else "disappeared"
+                    self._events.append(VisionEvent(self._seq, name, kind, score, box, seen.frame.timestamp))
+                self._visible[name] = visible
+            self._latest = seen
+            self._cond.notify_all()
+        self.recorder.record(seen)
+
+    def latest(self, after=None, timeout=2.0):
+        """Most recent Detections, optionally waiting for one captured after `after`."""
+        if not self.running:
+            # Synchronous mode (replays): detect inline, still publishing events and gating
+            seen = self._detect(self.get_config())
+            self._publish(seen)
+            return seen
+
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._latest is None or (after is not None and self._latest.frame.timestamp <= after):
+                remaining = deadline - time.time()
+                if remaining <= 0 or self._stop.is_set():
+                    break
+                self._cond.wait(remaining)
+            if self._latest is not None:
+                return self._latest
+        return detect_all(self.grab(), self.targets, self.get_config())
+
+    def forget(self, names):
+        """Drops the results of `names` (e.g. just clicked): the next frame matches them again."""
+        with self._cond:
+            self._stale.update(names)
+        self.scheduler.wakeup.set()
+
+    def events(self, since_seq=0):
+        with self._cond:
+            return [e for e in self._events if e.seq > since_seq]
+
+    def wait_for(self, names, timeout):
+        """Waits up to `timeout` seconds for one of `names` to appear.
+
+        Returns the "appeared" VisionEvent, or None on timeout. Without a running
+        worker this is a plain sleep.
+        """
+        if not self.running:
+            backends.clock().sleep(timeout)
+            return None
+
+        deadline = time.time() + timeout
+        with self._cond:
+            start_seq = self._seq
+            while not self._stop.is_set():
+                for event in self._events:
+                    if event.seq > start_seq and event.kind == "appeared" and event.name in names:
+                        return event
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+        return None
@@ -5,36 +5,72 @@ import time
 import os
 import random
 import traceback
+from collections import deque
 from datetime import datetime
 from PIL import Image, ImageTk
-import pyautogui
 import keyboard
 
 from src.utils.config import load_config, save_config, ASSETS_DIR, LOG_FILE
 from src.ui.components import CoordinatePicker, AreaPicker
-from src.core.bot_engine import BotEngine
-from src.core.vision import ScreenCaptureTool
+from src.core.template_pack import pack
+from src.utils.metrics import metrics
+from src.utils.logger import LogWriter
+from src.utils.discord import notifier
+from src.utils.history import history_for
+from src.utils.startup import profiler
+
+# The engine, vision (OpenCV) and pyautogui are imported on first use, after the window is up
+
+# Status texts set by the engine, used to filter the console by phase
+PHASES = ["IDLE", "CHECK / STARTING", "WAITING FOR MATCH", "AUTO-PUNCHING", "IN GAME (MOVING)", "MATCH ENDED"]
 
 class SCGMAutoBR:
     def __init__(self, root):
         self.root = root
         self.root.title("SCGM-Auto-Br (Advanced)")
-        self.root.geometry("600x650")
+        self.root.geometry("600x720")
         self.root.attributes('-topmost', True)
         
         self.is_running = False
         self.match_count = 0
         self.start_time = None
-        self.config = load_config()
+        with profiler.step("load_config"):
+            self.config = load_config()
         self.asset_previews = {}
+        self.log_writer = LogWriter(LOG_FILE, self.config.get("log_max_bytes", 5 * 1024 * 1024),
+                                    self.config.get("log_backups", 3))
+        self.pending_console = deque() # Entries waiting for the next console flush
+        self.console_buffer = deque(maxlen=self.config.get("console_lines", 2000)) # Last N entries
+        self.console_line_count = 0
+        self.current_phase = "IDLE"
         
-        self.engine = BotEngine(self)
+        self._engine = None # Created on first use, see engine
+        self.instances = [] # Multi-instance mode, created on start from config["instances"]
+        notifier.log = self.log
         
         keyboard.add_hotkey('f1', self.toggle_bot_hotkey)
         
-        self.setup_ui()
+        with profiler.step("template pack sync"):
+            rebuilt = pack.sync(self.config) # Previews and templates below come from the pack
+        with profiler.step("setup_ui"):
+            self.setup_ui()
+        metrics.start_export(self.config.get("metrics_file"), self.config.get("metrics_interval", 30))
+        self.refresh_stats()
+        self.flush_console()
+        for problem in self.config.problems:
+            self.log(problem, is_error=True)
+        if rebuilt:
+            self.log(f"Template pack: rebuilt {', '.join(rebuilt)}")
         self.log("Bot Initialized. Press F1 to Start/Stop!")
 
+    @property
+    def engine(self):
+        """The single-instance BotEngine; importing it loads vision and OpenCV, so not at startup."""
+        if self._engine is None:
+            from src.core.bot_engine import BotEngine
+            self._engine = BotEngine(self)
+        return self._engine
+
     def toggle_bot_hotkey(self):
         self.root.after(0, self.toggle_bot)
 
@@ -98,6 +134,11 @@ class SCGMAutoBR:
         ttk.Radiobutton(mode_frame, text="Full Match", variable=self.mode_var, value="full", command=self.on_mode_change).pack(side=tk.LEFT, padx=10)
         ttk.Radiobutton(mode_frame, text="Quick Leave", variable=self.mode_var, value="quick", command=self.on_mode_change).pack(side=tk.LEFT, padx=10)
 
+        perf_frame = ttk.LabelFrame(self.main_tab, text=" Performance ", padding="5")
+        perf_frame.pack(fill=tk.X, pady=5)
+        self.lbl_perf = ttk.Label(perf_frame, text="No data yet", font=('Consolas', 8), justify=tk.LEFT)
+        self.lbl_perf.pack(anchor=tk.W)
+
         btn_frame = ttk.Frame(self.main_tab)
         btn_frame.pack(fill=tk.X, pady=10)
         self.status_label = ttk.Label(btn_frame, text="Status: IDLE", font=('Segoe UI', 10, 'bold'))
@@ -105,6 +146,19 @@ class SCGMAutoBR:
         self.btn_toggle = ttk.Button(btn_frame, text="START BOT", command=self.toggle_bot)
         self.btn_toggle.pack(fill=tk.X)
 
+        filter_frame = ttk.Frame(self.main_tab)
+        filter_frame.pack(fill=tk.X)
+        ttk.Label(filter_frame, text="Show:").pack(side=tk.LEFT)
+        self.level_filter = ttk.Combobox(filter_frame, values=["All", "Errors"], width=8, state="readonly")
+        self.level_filter.set("All")
+        self.level_filter.pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Phase:").pack(side=tk.LEFT)
+        self.phase_filter = ttk.Combobox(filter_frame, values=["All"] + PHASES, width=20, state="readonly")
+        self.phase_filter.set("All")
+        self.phase_filter.pack(side=tk.LEFT, padx=5)
+        self.level_filter.bind("<<ComboboxSelected>>", lambda e: self.render_console())
+        self.phase_filter.bind("<<ComboboxSelected>>", lambda e: self.render_console())
+
         self.console = scrolledtext.ScrolledText(self.main_tab, height=13, state='disabled', font=('Consolas', 9))
         self.console.pack(fill=tk.BOTH, expand=True, pady=5)
 
@@ -130,6 +184,13 @@ class SCGMAutoBR:
             ttk.Button(info_frame, text="Choose Image", width=15, command=lambda k=key, l=lbl_path: self.browse_asset(k, l)).pack(anchor=tk.W, pady=2)
             ttk.Button(info_frame, text="Capture Helper", width=15, command=lambda k=key, l=lbl_path: self.start_capture_helper(k, l)).pack(anchor=tk.W, pady=2)
 
+            roi_frame = ttk.Frame(info_frame)
+            roi_frame.pack(anchor=tk.W, pady=2)
+            lbl_roi = ttk.Label(roi_frame, text=f"ROI: {self.config['rois'].get(key) or 'Auto'}", font=('Segoe UI', 8))
+            ttk.Button(roi_frame, text="Pin ROI", width=8, command=lambda k=key, l=lbl_roi: self.pick_roi(k, l)).pack(side=tk.LEFT)
+            ttk.Button(roi_frame, text="Clear", width=6, command=lambda k=key, l=lbl_roi: self.clear_roi(k, l)).pack(side=tk.LEFT, padx=2)
+            lbl_roi.pack(side=tk.LEFT, padx=5)
+
             if key == "ultimate":
                 ttk.Separator(info_frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=5)
                 self.lbl_pos1 = ttk.Label(info_frame, text=f"Book: {self.config.get('pos_1')}", font=('Segoe UI', 8))
@@ -195,24 +256,104 @@ class SCGMAutoBR:
         self.log("Hotkeys updated and saved!")
 
     def log(self, msg, is_error=False):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        full_ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        def _update_ui():
+        # Safe from any thread: both sides only enqueue, the UI and the file are updated in batches
+        now = datetime.now()
+        self.pending_console.append((f"[{now:%H:%M:%S}] {msg}\n", is_error, self.current_phase))
+        self.log_writer.write(f"[{now:%Y-%m-%d %H:%M:%S}] {'[ERROR] ' if is_error else ''}{msg}\n")
+
+    def console_filter(self, entry):
+        _, is_error, phase = entry
+        if self.level_filter.get() == "Errors" and not is_error:
+            return False
+        return self.phase_filter.get() in ("All", phase)
+
+    def flush_console(self):
+        """Moves queued log entries into the ring buffer and the console in one insert, every 150 ms."""
+        lines = []
+        while self.pending_console:
+            entry = self.pending_console.popleft()
+            self.console_buffer.append(entry)
+            if self.console_filter(entry):
+                lines.append(entry[0])
+        if lines:
             self.console.configure(state='normal')
-            self.console.insert(tk.END, f"[{timestamp}] {msg}\n")
+            self.console.insert(tk.END, "".join(lines))
+            # Text lines, not entries: tracebacks span several
+            self.console_line_count += sum(line.count("\n") for line in lines)
+            # Trim in bulk once the widget holds 10% more lines than the buffer keeps
+            capacity = self.console_buffer.maxlen
+            if self.console_line_count > capacity + capacity // 10:
+                excess = self.console_line_count - capacity
+                self.console.delete("1.0", f"{excess + 1}.0")
+                self.console_line_count = capacity
             self.console.see(tk.END)
             self.console.configure(state='disabled')
-        
-        self.root.after(0, _update_ui)
-        
-        try:
-            with open(LOG_FILE, "a", encoding="utf-8") as f:
-                f.write(f"[{full_ts}] {'[ERROR] ' if is_error else ''}{msg}\n")
-        except: pass
-
-    def update_status(self, text, color):
-        self.root.after(0, lambda: self.status_label.config(text=f"Status: {text}", foreground=color))
+        self.root.after(150, self.flush_console)
+
+    def render_console(self):
+        """Redraws the console from the ring buffer with the current level/phase filter."""
+        lines = [entry[0] for entry in self.console_buffer if self.console_filter(entry)]
+        self.console.configure(state='normal')
+        self.console.delete("1.0", tk.END)
+        self.console.insert(tk.END, "".join(lines))
+        self.console_line_count = sum(line.count("\n") for line in lines)
+        self.console.see(tk.END)
+        self.console.configure(state='disabled')
+
+    def refresh_stats(self):
+        """Redraws the Performance panel from the metrics registry every 2 seconds."""
+        phases = {dict(labels)["phase"]: h for labels, h in metrics.histograms("phase_seconds").items()}
+        checks = metrics.histograms("vision_check_seconds")
+        results = metrics.counters("vision_checks_total")
+        captures = metrics.histograms("vision_capture_seconds")
+        clicks = metrics.histograms("click_seconds")
+        jitter = next(iter(metrics.histograms("input_jitter_seconds").values()), None)
+
+        lines = []
+        if phases:
+            order = ["lobby_search", "match_waiting", "auto_punch", "in_game", "post_match"]
+            lines.append("Phases (avg): " + " | ".join(
+                f"{p} {phases[p].mean:.1f}s" for p in order if p in phases))
+        if checks:
+            count = sum(h.count for h in checks.values())
+            total = sum(h.sum for h in checks.values())
+            hits = sum(v for labels, v in results.items() if dict(labels)["result"] == "hit")
+            capture = next(iter(captures.values()), None)
+            lines.append(f"Vision: check {1000 * total / max(1, count):.1f}ms avg, "
+                         f"{100 * hits / max(1, count):.0f}% hits, "
+                         f"capture {1000 * (capture.mean if capture else 0):.0f}ms avg")
+            slowest_labels, slowest = max(checks.items(), key=lambda item: item[1].mean)
+            lines.append(f"Slowest check: {dict(slowest_labels)['template']} {1000 * slowest.mean:.1f}ms avg")
+        if clicks:
+            count = sum(h.count for h in clicks.values())
+            total = sum(h.sum for h in clicks.values())
+            lines.append(f"Clicks: {count} x {total / max(1, count):.2f}s avg")
+        if jitter:
+            lines.append(f"Input jitter: {1000 * jitter.mean:.1f}ms avg, "
+                         f"p99 {1000 * jitter.quantile(0.99):.1f}ms")
+
+        history = history_for(self.config.get("history_file"))
+        summary = history.stats() if history else None
+        if summary and summary["matches"]:
+            avg = int(summary["avg_duration"])
+            lines.append(f"History: {summary['matches']} matches, {avg // 60}m {avg % 60:02d}s avg, "
+                         f"{summary['per_hour']:.1f}/h over {summary['running_hours']:.1f}h running, failsafe {100 * summary['failsafe_rate']:.1f}%, "
+                         f"timeout {100 * summary['timeout_rate']:.1f}%")
+        startup = next(iter(metrics.histograms("startup_first_window_seconds").values()), None)
+        if startup:
+            lines.append(f"Startup: first window after {startup.mean:.2f}s")
+
+        scan = self._engine.vision.scheduler if self._engine else None
+        if self.is_running and scan and scan.phase:
+            lines.append(f"Scan: {scan.phase} every {scan.interval():.2f}s, "
+                         f"CPU {100 * scan.cpu_usage:.0f}% (budget {100 * scan.cpu_budget:.0f}%)")
+        self.lbl_perf.config(text="\n".join(lines) or "No data yet")
+        self.root.after(2000, self.refresh_stats)
+
+    def update_status(self, text, color, label=None):
+        self.current_phase = text
+        label = label or text
+        self.root.after(0, lambda: self.status_label.config(text=f"Status: {label}", foreground=color))
 
     def update_match_count(self):
         self.root.after(0, lambda: self.lbl_match.config(text=f"Matches: {self.match_count}"))
@@ -248,8 +389,10 @@ class SCGMAutoBR:
     def browse_asset(self, key, label_widget):
         file_path = filedialog.askopenfilename(initialdir=ASSETS_DIR, filetypes=(("PNG", "*.png"), ("All", "*.*")))
         if file_path:
+            from src.core.vision import templates
             rel = os.path.relpath(file_path, os.getcwd())
             self.config["images"][key] = rel
+            templates.invalidate(key)
             label_widget.config(text=f"File: {os.path.basename(rel)}")
             save_config(self.config)
             self.update_preview(key, label_widget.master.master.winfo_children()[-1])
@@ -258,6 +401,8 @@ class SCGMAutoBR:
         self.root.iconify()
         self.log(f"Capturing {key} in 2.5s...")
         def run():
+            import pyautogui
+            from src.core.vision import ScreenCaptureTool
             time.sleep(2.5)
             screenshot = pyautogui.screenshot()
             def complete(path):
@@ -270,6 +415,7 @@ class SCGMAutoBR:
         threading.Thread(target=run, daemon=True).start()
 
     def pick_coord(self, key, label_widget):
+        import pyautogui
         self.root.iconify()
         time.sleep(1)
         screenshot = pyautogui.screenshot()
@@ -281,6 +427,7 @@ class SCGMAutoBR:
         CoordinatePicker(self.root, screenshot, complete)
 
     def pick_area(self):
+        import pyautogui
         self.root.iconify()
         time.sleep(1)
         screenshot = pyautogui.screenshot()
@@ -292,17 +439,35 @@ class SCGMAutoBR:
             self.root.deiconify()
         AreaPicker(self.root, screenshot, complete)
 
+    def pick_roi(self, key, label_widget):
+        import pyautogui
+        self.root.iconify()
+        time.sleep(1)
+        screenshot = pyautogui.screenshot()
+        def complete(res):
+            from src.core.vision import regions
+            self.config["rois"][key] = list(res)
+            regions.forget(key)
+            label_widget.config(text=f"ROI: {list(res)}")
+            save_config(self.config)
+            self.root.deiconify()
+        AreaPicker(self.root, screenshot, complete)
+
+    def clear_roi(self, key, label_widget):
+        self.config["rois"].pop(key, None)
+        label_widget.config(text="ROI: Auto")
+        save_config(self.config)
+
     def update_preview(self, key, label_widget):
         path = self.config["images"][key]
-        if not os.path.isabs(path): path = os.path.join(os.getcwd(), path)
         if os.path.exists(path):
-            try:
-                img = Image.open(path)
-                img.thumbnail((60, 60))
-                photo = ImageTk.PhotoImage(img)
+            # The pack's thumbnail, the PNG is only decoded when it changed
+            thumb = pack.preview(key, path)
+            if thumb is not None:
+                photo = ImageTk.PhotoImage(Image.fromarray(thumb))
                 label_widget.config(image=photo)
                 label_widget.image = photo
-            except: label_widget.config(text="Error", image="")
+            else: label_widget.config(text="Error", image="")
         else: label_widget.config(text="Missing", image="")
 
     def toggle_bot(self):
@@ -325,7 +490,14 @@ class SCGMAutoBR:
             self.start_time = time.time()
             self.update_timer()
             self.log("Starting...")
-            threading.Thread(target=self.engine.bot_loop, daemon=True).start()
+            from src.core.instances import create_instances
+            self.instances = create_instances(self)
+            if self.instances:
+                self.log(f"Multi-instance mode: {', '.join(i.name for i in self.instances)}")
+                for instance in self.instances:
+                    threading.Thread(target=instance.engine.bot_loop, daemon=True).start()
+            else:
+                threading.Thread(target=self.engine.bot_loop, daemon=True).start()
         else:
             self.is_running = False
             self.btn_toggle.config(text="START BOT")
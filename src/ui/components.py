@@ -1,6 +1,84 @@
+import time
 import tkinter as tk
 from PIL import ImageTk
 
+FRAME_MS = 16 # Overlays redraw at most once per frame of a 60 Hz display
+
+class RedrawThrottle:
+    """Event handler that redraws at most once every interval_ms with the latest event.
+
+    Mouse events arrive far faster than the screen refreshes; the ones in between two
+    redraws are dropped instead of each being drawn.
+    """
+    def __init__(self, widget, draw, interval_ms=FRAME_MS):
+        self.widget = widget
+        self.draw = draw
+        self.interval_ms = interval_ms
+        self._event = None
+        self._pending = None
+        self._last = 0.0
+
+    def __call__(self, event):
+        self._event = event
+        if self._pending is None:
+            delay = max(0, int(self.interval_ms - (time.perf_counter() - self._last) * 1000))
+            self._pending = self.widget.after(delay, self._fire)
+
+    def _fire(self):
+        self._pending = None
+        self._last = time.perf_counter()
+        event, self._event = self._event, None
+        if event is not None and self.widget.winfo_exists():
+            self.draw(event)
+
+    def cancel(self):
+        if self._pending is not None:
+            self.widget.after_cancel(self._pending)
+            self._pending = None
+        self._event = None
+
+def photo_copy(dest, source, box, to=(0, 0), zoom=1, shrink=False):
+    """Copies the (left, top, right, bottom) block of one Tk photo into another.
+
+    The copy (and zoom) runs inside Tk, so no PIL image is created or converted.
+    """
+    args = ["-from", *box, "-to", *to]
+    if zoom > 1:
+        args += ["-zoom", zoom]
+    if shrink:
+        args.append("-shrink")
+    dest.tk.call(str(dest), "copy", str(source), *args)
+
+class Magnifier:
+    """Zoomed view around the cursor: one reused photo and two crosshair lines.
+
+    `source` is the screenshot already converted to a Tk photo; each update copies the
+    block around the cursor out of it with Tk's pixel zoom.
+    """
+    def __init__(self, parent, source, size=180, zoom=4):
+        self.source = source
+        self.size = size
+        self.zoom = zoom
+        self.canvas = tk.Canvas(parent, width=size, height=size, highlightthickness=2, highlightbackground="red")
+        self.photo = tk.PhotoImage(master=self.canvas, width=size, height=size)
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+        self.canvas.create_line(size // 2, 0, size // 2, size, fill="red")
+        self.canvas.create_line(0, size // 2, size, size // 2, fill="red")
+
+    def show(self, x, y):
+        size = self.size
+        mag_x = x + 30 if x + size + 60 < self.canvas.winfo_screenwidth() else x - size - 30
+        mag_y = y + 30 if y + size + 60 < self.canvas.winfo_screenheight() else y - size - 30
+        self.canvas.place(x=mag_x, y=mag_y)
+
+        box = size // self.zoom
+        left, top = x - box // 2, y - box // 2
+        src = (max(0, left), max(0, top), min(self.source.width(), left + box), min(self.source.height(), top + box))
+        self.photo.blank() # Off-screen parts stay empty, the cursor stays centered
+        if src[0] < src[2] and src[1] < src[3]:
+            to = ((src[0] - left) * self.zoom, (src[1] - top) * self.zoom)
+            photo_copy(self.photo, self.source, src, to=to, zoom=self.zoom)
+
 class CoordinatePicker:
     """A tool to pick a single x, y coordinate from the screen."""
     def __init__(self, parent, screenshot, on_complete):
@@ -50,10 +128,11 @@ class AreaPicker:
         
         self.start_x = None
         self.start_y = None
-        self.rect = None
+        self.rect = self.canvas.create_rectangle(0, 0, 0, 0, outline='red', width=2, state=tk.HIDDEN)
+        self.redraw = RedrawThrottle(self.top, self.on_drag)
         
         self.canvas.bind("<ButtonPress-1>", self.on_press)
-        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<B1-Motion>", self.redraw)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
         self.top.bind("<Escape>", lambda e: self.top.destroy())
         
@@ -63,8 +142,8 @@ class AreaPicker:
     def on_press(self, event):
         self.start_x = event.x
         self.start_y = event.y
-        if self.rect: self.canvas.delete(self.rect)
-        self.rect = self.canvas.create_rectangle(self.start_x, self.start_y, 1, 1, outline='red', width=2)
+        self.canvas.coords(self.rect, self.start_x, self.start_y, event.x, event.y)
+        self.canvas.itemconfigure(self.rect, state=tk.NORMAL)
 
     def on_drag(self, event):
         self.canvas.coords(self.rect, self.start_x, self.start_y, event.x, event.y)
@@ -79,6 +158,8 @@ class AreaPicker:
         if right - left < 5 or bottom - top < 5:
             return
 
+        self.redraw.cancel()
+
         self.result = (left, top, right, bottom)
         self.on_complete(self.result)
         self.top.destroy()
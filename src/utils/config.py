@@ -1,55 +1,268 @@
 import os
+import copy
 import json
+import atexit
+import shutil
+import threading
+from collections import namedtuple
 
 CONFIG_FILE = "config.json"
 ASSETS_DIR = os.path.join("src", "assets")
 LOG_FILE = "debug_log.txt"
+SAVE_DELAY = 1.0 # Bursts of UI changes within this window end up in one write
 
-def load_config():
-    default_config = {
-        "discord_webhook": "",
-        "confidence": 0.8,
-        "scan_interval": 2.0,
-        "match_mode": "full", # New: "full" or "quick"
-        "movement_duration": 300,  # 5 minutes in seconds
-        "images": {
-            "change": "src/assets/change.png",
-            "br_mode": "src/assets/br_mode.png",
-            "solo_mode": "src/assets/solo_mode.png",
-            "return_to_lobby_alone": "src/assets/leave.png",
-            "ultimate": "src/assets/ultimate.png",                 
-            "open": "src/assets/open.png",
-            "continue": "src/assets/continue.png"
-        },
-        "pos_1": [100, 100],
-        "pos_2": [200, 200],
-        "outcome_area": None,
-        "keys": {
-            "menu": "m",
-            "slot_1": "1",
-            "forward": "w",
-            "left": "a",
-            "backward": "s",
-            "right": "d"
-        }
-    }
-    if os.path.exists(CONFIG_FILE):
+class ConfigError(ValueError):
+    pass
+
+# kind: accepted type(s), float also accepts ints; check: returns a problem description or None
+Field = namedtuple("Field", "default kind check")
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+def _type_problem(kind, v):
+    if kind is float:
+        return None if _is_number(v) else "must be a number"
+    if kind is int:
+        return None if isinstance(v, int) and not isinstance(v, bool) else "must be an integer"
+    return None if isinstance(v, kind) else "has the wrong type"
+
+def _between(low, high):
+    return lambda v: None if low <= v <= high else f"must be between {low} and {high}"
+
+def _one_of(*choices):
+    return lambda v: None if v in choices else f"must be one of: {', '.join(choices)}"
+
+def _numbers(count):
+    def check(v):
+        if len(v) != count or not all(_is_number(n) for n in v):
+            return f"must be {count} numbers"
+    return check
+
+def _area(v):
+    problem = _numbers(4)(v)
+    if problem is None and (v[0] >= v[2] or v[1] >= v[3]):
+        problem = "must be [left, top, right, bottom]"
+    return problem
+
+def _optional(check):
+    return lambda v: None if v is None else check(v)
+
+def _instances(specs):
+    for spec in specs:
+        if not isinstance(spec, dict) or not isinstance(spec.get("name"), str) or not spec["name"].strip():
+            return "entries need a name"
+        region = spec.get("region")
+        if region is not None and (_type_problem((list, tuple), region) or _area(region)):
+            return f"entry {spec['name']} region must be [left, top, right, bottom]"
+        if region is None and not spec.get("window"):
+            return f"entry {spec['name']} needs a region or a window title"
+        for key in ("window", "config"):
+            if spec.get(key) is not None and not isinstance(spec[key], str):
+                return f"entry {spec['name']} {key} must be a string"
+        index = spec.get("window_index", 0)
+        problem = _type_problem(int, index) or _between(0, 64)(index)
+        if problem:
+            return f"entry {spec['name']} window_index {problem}"
+
+def _each(kind, check=None):
+    """Validates every value of a name -> value mapping."""
+    def run(mapping):
+        for name, v in mapping.items():
+            problem = _type_problem(kind, v) or (check(v) if check else None)
+            if problem:
+                return f"entry {name} {problem}"
+    return run
+
+SCHEMA = {
+    "discord_webhook": Field("", str, None),
+    "confidence": Field(0.8, float, _between(0.1, 1.0)),
+    "thresholds": Field({ # Per-image confidence overrides
+        "return_to_lobby_alone": 0.7
+    }, dict, _each(float, _between(0.1, 1.0))),
+    "match_engine": Field("full", str, _one_of("full", "pyramid")), # Full-resolution NCC or coarse-to-fine
+    "pyramid_scale": Field(0.5, float, _between(0.1, 1.0)), # Downscale factor of the pyramid engine's coarse pass
+    "match_processes": Field(0, int, _between(0, 32)), # Match templates in N worker processes (0: in-process)
+    "vision_worker": Field(True, bool, None), # Detect on a background thread (off: detect inline, e.g. for replays)
+    "vision_fps": Field(10, float, _between(0.5, 60)), # Capture + match rate of the background vision worker
+    "frame_gate": Field(True, bool, None), # Reuse the last detections while the screen is unchanged
+    "cpu_budget": Field(0.25, float, _between(0, 16)), # Process CPU (in cores) before polling slows down, 0 = unlimited
+    "input_thread": Field(True, bool, None), # Play input sequences on a background thread (off: play inline)
+    "metrics_file": Field("metrics.json", (str, type(None)), None), # Periodic metrics dump (.prom/.txt for Prometheus text)
+    "metrics_interval": Field(30, float, _between(1, 3600)),
+    "history_file": Field("match_history.db", (str, type(None)), None), # SQLite match history, null = off
+    "history_images": Field(True, bool, None), # Keep each match's outcome screenshot next to its record
+    "recorder_seconds": Field(30, float, _between(0, 600)), # Frames kept for failure dumps (flight_records/), 0 = off
+    "recorder_fps": Field(2, float, _between(0.1, 30)),
+    "recorder_max_mb": Field(16, float, _between(1, 1024)), # Memory cap of the recorded frames
+    "recorder_scale": Field(0.5, float, _between(0.1, 1.0)), # Downscale factor of recorded frames
+    "log_max_bytes": Field(5242880, int, _between(0, 1 << 31)), # Rotate debug_log.txt at 5 MB
+    "log_backups": Field(3, int, _between(0, 20)),
+    "console_lines": Field(2000, int, _between(100, 100000)), # Log lines kept in the Bot Control console
+    "match_mode": Field("full", str, _one_of("full", "quick")),
+    "movement_duration": Field(300, float, _between(0, 3600)), # 5 minutes in seconds
+    "images": Field({
+        "change": "src/assets/change.png",
+        "br_mode": "src/assets/br_mode.png",
+        "solo_mode": "src/assets/solo_mode.png",
+        "return_to_lobby_alone": "src/assets/leave.png",
+        "ultimate": "src/assets/ultimate.png",
+        "open": "src/assets/open.png",
+        "continue": "src/assets/continue.png"
+    }, dict, _each(str)),
+    "rois": Field({}, dict, _each((list, tuple), _area)), # Pinned search areas per image: name -> [left, top, right, bottom]
+    "pos_1": Field([100, 100], (list, tuple), _numbers(2)),
+    "pos_2": Field([200, 200], (list, tuple), _numbers(2)),
+    "outcome_area": Field(None, (list, tuple, type(None)), _optional(_area)),
+    "outcome_format": Field("png", str, _one_of("png", "jpeg", "webp")), # Discord screenshot encoding
+    "outcome_quality": Field(85, int, _between(1, 100)), # JPEG/WebP quality
+    "outcome_scale": Field(1.0, float, _between(0.1, 1.0)), # Downscale factor before encoding
+    # Multi-instance mode: [{"name", "region" or "window" (+ "window_index"), "config"}], empty = off
+    "instances": Field([], list, _instances),
+    "keys": Field({
+        "menu": "m",
+        "slot_1": "1",
+        "forward": "w",
+        "left": "a",
+        "backward": "s",
+        "right": "d"
+    }, dict, _each(str, lambda v: None if v else "must not be empty")),
+}
+
+# Mappings that keep the defaults for names missing from the user's file
+MERGED = ("images", "keys", "thresholds")
+# Of those, the ones whose names are fixed: entries the defaults do not know are dropped
+FIXED_NAMES = ("images", "keys")
+
+def field_problem(key, value):
+    """Why `value` is not valid for `key`, or None. Keys outside SCHEMA are not checked."""
+    field = SCHEMA.get(key)
+    if field is None:
+        return None
+    return _type_problem(field.kind, value) or (field.check(value) if field.check else None)
+
+def validate(values):
+    """Returns (clean values, problems). Invalid fields fall back to their defaults."""
+    clean, problems = {}, []
+    for key, value in values.items():
+        if key not in SCHEMA:
+            clean[key] = value # Kept as is, e.g. written by a newer version
+    for key, field in SCHEMA.items():
+        value = values.get(key, field.default)
+        if key in MERGED and isinstance(value, dict):
+            if key in FIXED_NAMES:
+                value = {k: v for k, v in value.items() if k in field.default}
+            value = {**field.default, **value}
+        problem = field_problem(key, value)
+        if problem:
+            problems.append(f"Config: {key} {problem}, using the default.")
+            value = field.default
+        clean[key] = copy.deepcopy(value)
+    return clean, problems
+
+class Snapshot(dict):
+    """Read-only copy of the config at one version, safe to read from any thread."""
+    def __init__(self, values, version):
+        super().__init__(values)
+        self.version = version
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("config snapshots are read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+class Config(dict):
+    """The live settings, validated against SCHEMA and saved with debounced atomic writes.
+
+    The UI edits it like a dict and calls save(). Top-level assignments are validated
+    right away, nested edits (config["images"][key] = path) when saved. save() only
+    schedules the write: changes within `delay` seconds are written once, to a temp file
+    that then replaces config.json. The engine reads snapshot(), which is rebuilt on the
+    editing thread after each change, so a check never sees a half-applied edit.
+    """
+    def __init__(self, values, path=CONFIG_FILE, delay=SAVE_DELAY, problems=()):
+        super().__init__(values)
+        self.path = path
+        self.delay = delay
+        self.problems = list(problems) # What load_config had to fix, reported by the UI
+        self.version = 0
+        self._lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+        self._snapshot = Snapshot(copy.deepcopy(dict(self)), self.version)
+        atexit.register(self.flush)
+
+    def __setitem__(self, key, value):
+        problem = field_problem(key, value)
+        if problem:
+            raise ConfigError(f"{key} {problem}")
+        super().__setitem__(key, value)
+        self._publish()
+
+    def _publish(self):
+        self.version += 1
+        self._snapshot = Snapshot(copy.deepcopy(dict(self)), self.version)
+
+    def snapshot(self):
+        return self._snapshot
+
+    def save(self):
+        """Validates the current values and schedules a write after `delay` seconds."""
+        for key in SCHEMA:
+            problem = field_problem(key, self.get(key))
+            if problem:
+                raise ConfigError(f"{key} {problem}")
+        self._publish()
+        text = json.dumps(self, indent=4)
+        with self._lock:
+            self._pending = text
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Writes a scheduled save immediately. Also runs at exit so no change is lost."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            text, self._pending = self._pending, None
+            if text is None:
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+def load_config(path=CONFIG_FILE):
+    """Loads and validates the config file; what had to be fixed is in config.problems.
+
+    A file that cannot be parsed is copied to <path>.bad before falling back to the
+    defaults, so the next save does not destroy it.
+    """
+    user_config, problems = {}, []
+    if os.path.exists(path):
         try:
-            with open(CONFIG_FILE, "r") as f:
+            with open(path, "r", encoding="utf-8") as f:
                 user_config = json.load(f)
-                
-                if "images" in user_config:
-                    merged_images = default_config["images"].copy()
-                    for k, v in user_config["images"].items():
-                        if k in merged_images:
-                            merged_images[k] = v
-                    user_config["images"] = merged_images
-                
-                return {**default_config, **user_config}
-        except:
-            return default_config
-    return default_config
+            if not isinstance(user_config, dict):
+                raise ValueError("expected a JSON object")
+        except (OSError, ValueError) as e:
+            user_config = {}
+            problems.append(f"Config: {path} could not be read ({e}), using defaults.")
+            try:
+                shutil.copyfile(path, path + ".bad")
+                problems.append(f"Config: the unreadable file was kept as {path}.bad")
+            except OSError:
+                pass
+
+    values, invalid = validate(user_config)
+    return Config(values, path, problems=problems + invalid)
 
 def save_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=4)
+    """Schedules a debounced, atomic write of the config (see Config.save)."""
+    config.save()
@@ -1,20 +1,225 @@
-import requests
 import os
+import json
+import time
+import uuid
+import atexit
+import threading
 
-def send_discord(webhook_url, message, file_path=None):
-    if not webhook_url or not webhook_url.strip():
-        return
-    try:
-        payload = {"content": message}
-        # Ensure we use an absolute path for reliability
-        if file_path:
-            abs_path = os.path.abspath(file_path)
-            if os.path.exists(abs_path):
-                with open(abs_path, 'rb') as f:
-                    r = requests.post(webhook_url, data=payload, files={'file': ('screenshot.png', f, 'image/png')})
-                    return r.status_code
-        
-        r = requests.post(webhook_url, json=payload)
-        return r.status_code
-    except Exception:
-        return None
+OUTBOX_FILE = "discord_outbox.json"
+OUTBOX_DIR = "discord_outbox" # Attachments of queued messages
+
+class DiscordNotifier:
+    """Delivers webhook messages on a background thread so callers never block on the network.
+
+    One pooled session is reused for every request. Each request has a timeout, transient
+    failures are retried with exponential backoff, and 429 responses wait for Discord's
+    retry_after. Pending messages are persisted to OUTBOX_FILE and resent after a restart;
+    messages that still fail after max_retries stay there for the next start.
+    """
+    def __init__(self, outbox_path=OUTBOX_FILE, outbox_dir=OUTBOX_DIR, timeout=10, max_retries=5, backoff=2.0, log=None):
+        self.outbox_path = outbox_path
+        self.outbox_dir = outbox_dir
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.log = log or (lambda msg, is_error=False: None)
+
+        self._cond = threading.Condition()
+        self._save_lock = threading.Lock() # Orders outbox writes, taken before self._cond
+        self._pending = []
+        self._deferred = [] # Gave up for this run, kept on disk for the next one
+        self._thread = None
+        self._session = None
+        self._loaded = False # Outbox read back; until then it is not overwritten
+
+    def _start(self):
+        # Only starts the thread: the caller holds self._cond and must not wait on imports or disk
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="DiscordNotifier", daemon=True)
+        self._thread.start()
+        atexit.register(self._persist)
+
+    def send(self, webhook_url, message, file_path=None, file=None):
+        """Queues a message and returns immediately.
+
+        Attach either an existing file_path or file=(bytes, file name, mime type). In-memory
+        attachments are uploaded straight from memory and only written to the outbox
+        directory when a delivery fails or backs off, or at exit while still queued, so
+        they survive a restart.
+        """
+        if not webhook_url or not webhook_url.strip():
+            return
+        item = {"url": webhook_url.strip(), "message": message, "file_path": None,
+                "file_name": "screenshot.png", "mime": "image/png", "owned": False}
+        if file is not None:
+            item["data"], item["file_name"], item["mime"] = file
+        elif file_path:
+            item["file_path"] = os.path.abspath(file_path)
+
+        with self._cond:
+            self._start()
+            self._pending.append(item) # Written to the outbox by the notifier thread
+            self._cond.notify()
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending)
+
+    def _load_outbox(self):
+        if not os.path.exists(self.outbox_path):
+            return []
+        try:
+            with open(self.outbox_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _spill(self, item):
+        """Writes an in-memory attachment to the outbox directory; returns its path."""
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        path = os.path.abspath(os.path.join(self.outbox_dir, f"{uuid.uuid4().hex}_{item['file_name']}"))
+        with open(path, "wb") as f:
+            f.write(item["data"])
+        return path
+
+    def _persist(self):
+        """Writes the queued in-memory attachments to disk and records them in the outbox."""
+        with self._cond:
+            unsaved = [item for item in self._pending if item.get("data") is not None and not item["file_path"]]
+        spilled = []
+        for item in unsaved: # Written without the lock, send() never waits on the disk
+            try:
+                spilled.append((item, self._spill(item)))
+            except OSError:
+                pass
+        with self._cond:
+            for item, path in spilled:
+                item["file_path"], item["owned"] = path, True # The upload still reads "data"
+        self._save_outbox()
+
+    def _save_outbox(self):
+        """Writes the queued and deferred messages to the outbox file, without their bytes.
+
+        Called without self._cond held: the file is written outside it, so send() never
+        waits on the disk. In-memory attachments are persisted once spilled.
+        """
+        with self._save_lock:
+            with self._cond:
+                if not self._loaded:
+                    return
+                items = [{k: v for k, v in item.items() if k != "data"} for item in self._pending + self._deferred]
+            try:
+                if items:
+                    tmp_path = self.outbox_path + ".tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(items, f)
+                    os.replace(tmp_path, self.outbox_path)
+                elif os.path.exists(self.outbox_path):
+                    os.remove(self.outbox_path)
+            except OSError:
+                pass
+
+    def _post(self, item):
+        payload = {"content": item["message"]}
+        if item.get("data") is not None:
+            attachment = (item["file_name"], item["data"], item["mime"])
+            return self._session.post(item["url"], data=payload, timeout=self.timeout,
+                                      files={"file": attachment})
+        path = item.get("file_path")
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                attachment = (item.get("file_name", "screenshot.png"), f, item.get("mime", "image/png"))
+                return self._session.post(item["url"], data=payload, timeout=self.timeout,
+                                          files={"file": attachment})
+        return self._session.post(item["url"], json=payload, timeout=self.timeout)
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.json().get("retry_after", 1.0))
+        except (ValueError, TypeError, AttributeError): # Not JSON, or not an object
+            pass
+        try:
+            return float(response.headers.get("Retry-After", 1.0))
+        except (ValueError, TypeError):
+            return 1.0
+
+    def _deliver(self, item):
+        """Returns True when the item is done (sent or permanently rejected)."""
+        import requests
+        attempt = 0
+        while True:
+            try:
+                response = self._post(item)
+                if response.status_code == 429:
+                    delay = self._retry_after(response)
+                    self.log(f"Discord rate limited, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                if response.status_code < 400:
+                    return True
+                if response.status_code < 500:
+                    self.log(f"Discord rejected message ({response.status_code}), dropping it.", is_error=True)
+                    return True
+                error = f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                error = str(e)
+
+            attempt += 1
+            if attempt > self.max_retries:
+                self.log(f"Discord delivery failed after {self.max_retries} retries ({error}). "
+                         f"Kept in {self.outbox_path}.", is_error=True)
+                return False
+            self._persist() # Messages queued meanwhile must not depend on this one getting through
+            time.sleep(min(60.0, self.backoff * 2 ** (attempt - 1)))
+
+    def _setup(self):
+        """Reads back the outbox and opens the session, on the notifier thread."""
+        outbox = self._load_outbox()
+        with self._cond:
+            self._pending[:0] = outbox # Before the messages queued meanwhile
+            self._loaded = True
+        self._save_outbox()
+        if outbox:
+            self.log(f"Discord: resending {len(outbox)} undelivered message(s).")
+        # requests is imported with the first message, not at startup
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+    def _run(self):
+        self._setup()
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                item = self._pending[0]
+            self._save_outbox() # Records the messages queued since the last write
+
+            try:
+                delivered = self._deliver(item)
+            except Exception as e: # e.g. an unreadable attachment; the thread must keep going
+                self.log(f"Discord delivery error ({e}), kept in {self.outbox_path}.", is_error=True)
+                delivered = False
+            if not delivered:
+                self._persist() # Writes this attachment out before it leaves memory
+
+            with self._cond:
+                self._pending.remove(item)
+                if not delivered:
+                    item.pop("data", None) # Written to the outbox directory above
+                    self._deferred.append(item)
+                elif item.get("owned") and item.get("file_path"):
+                    try:
+                        os.remove(item["file_path"])
+                    except OSError:
+                        pass
+            self._save_outbox()
+
+notifier = DiscordNotifier()
+
+def send_discord(webhook_url, message, file_path=None, file=None):
+    """Queues a webhook message on the shared notifier. Never blocks the caller."""
+    notifier.send(webhook_url, message, file_path=file_path, file=file)
@@ -0,0 +1,211 @@
+import os
+import re
+import json
+import uuid
+import queue
+import atexit
+import sqlite3
+import threading
+from collections import namedtuple
+
+HISTORY_FILE = "match_history.db"
+OUTCOME_DIR = "match_outcomes" # Outcome screenshots referenced by the history
+END_REASONS = ("continue", "lobby", "timeout", "failsafe", "stopped")
+
+# phases: name -> seconds; outcome: (bytes, file name, mime) from encode_image, or None;
+# running: bot running time the match accounts for, since the previous match ended or the bot started
+MatchRecord = namedtuple("MatchRecord", "started ended mode end_reason phases outcome instance running")
+
+TABLES = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL NOT NULL,
+    mode TEXT NOT NULL,
+    end_reason TEXT NOT NULL,
+    phases TEXT NOT NULL,
+    outcome_image TEXT,
+    instance TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS totals (
+    end_reason TEXT PRIMARY KEY,
+    matches INTEGER NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runtime (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    matches INTEGER NOT NULL,
+    seconds REAL NOT NULL
+);
+"""
+
+class MatchHistory:
+    """Append-only SQLite history of finished matches with running totals.
+
+    record() returns at once: one writer thread inserts queued matches in WAL mode and
+    updates the `totals` (per end reason) and `runtime` tables in the same transaction.
+    The totals are read once when the history is opened and then kept up to date in
+    memory, so stats() never scans the matches table, however long it gets.
+    """
+    def __init__(self, path=HISTORY_FILE, outcome_dir=OUTCOME_DIR, log=None):
+        self.path = path
+        self.outcome_dir = outcome_dir
+        self.log = log or (lambda msg, is_error=False: None)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._totals = None # end_reason -> [matches, total seconds]
+        self._running = None # [matches, bot running seconds they account for]
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL") # Safe with WAL, one fsync per checkpoint
+        conn.executescript(TABLES)
+        return conn
+
+    def _open(self):
+        """Loads the totals and starts the writer on first use. Call with the lock held."""
+        if self._totals is not None:
+            return
+        self._totals = {}
+        try:
+            conn = self._connect()
+            try:
+                for reason, matches, duration in conn.execute("SELECT end_reason, matches, duration FROM totals"):
+                    self._totals[reason] = [matches, duration]
+                row = conn.execute("SELECT matches, seconds FROM runtime").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.log(f"History: {self.path} could not be opened ({e}), matches are not saved.", is_error=True)
+            return
+        self._running = list(row) if row else [0, 0.0]
+        self._thread = threading.Thread(target=self._run, name="MatchHistory", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, match):
+        """Queues a finished match and updates the in-memory totals."""
+        with self._lock:
+            self._open()
+            totals = self._totals.setdefault(match.end_reason, [0, 0.0])
+            totals[0] += 1
+            totals[1] += max(0.0, match.ended - match.started)
+            if self._running is not None:
+                self._running[0] += 1
+                self._running[1] += max(0.0, match.running)
+            if self._thread is not None:
+                self._queue.put(match)
+
+    def stats(self):
+        """Aggregates over the whole history, from the running totals."""
+        with self._lock:
+            self._open()
+            matches = sum(count for count, _ in self._totals.values())
+            duration = sum(seconds for _, seconds in self._totals.values())
+            reasons = {reason: count for reason, (count, _) in self._totals.items()}
+            timed, running = self._running or (0, 0.0)
+        return {
+            "matches": matches,
+            "avg_duration": duration / matches if matches else 0.0,
+            "running_hours": running / 3600,
+            "per_hour": timed * 3600 / running if running else 0.0, # Per hour of bot running time
+            "failsafe_rate": reasons.get("failsafe", 0) / matches if matches else 0.0,
+            "timeout_rate": reasons.get("timeout", 0) / matches if matches else 0.0,
+            "reasons": reasons
+        }
+
+    def recent(self, limit=20):
+        """The last `limit` matches, newest first, as dicts."""
+        with self._lock:
+            self._open()
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT * FROM matches ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [{**dict(row), "phases": json.loads(row["phases"])} for row in rows]
+
+    def _save_outcome(self, match):
+        if match.outcome is None:
+            return None
+        data, file_name, _ = match.outcome
+        _, ext = os.path.splitext(file_name)
+        instance = re.sub(r"\W+", "_", match.instance) + "_" if match.instance else ""
+        # Random suffix: instances finishing in the same second must not overwrite each other
+        name = f"{instance}{int(match.ended)}_{uuid.uuid4().hex[:8]}{ext or '.png'}"
+        path = os.path.join(self.outcome_dir, name)
+        try:
+            os.makedirs(self.outcome_dir, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        except OSError:
+            return None
+        return path
+
+    def _write(self, conn, matches):
+        with conn: # One transaction per batch
+            for match in matches:
+                duration = max(0.0, match.ended - match.started)
+                conn.execute("INSERT INTO matches (started, ended, mode, end_reason, phases, outcome_image, instance) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (match.started, match.ended, match.mode, match.end_reason,
+                              json.dumps({k: round(v, 2) for k, v in match.phases.items()}),
+                              self._save_outcome(match), match.instance or ""))
+                conn.execute("INSERT INTO totals VALUES (?, 1, ?) ON CONFLICT(end_reason) DO UPDATE "
+                             "SET matches = matches + 1, duration = duration + excluded.duration",
+                             (match.end_reason, duration))
+                conn.execute("INSERT INTO runtime VALUES (0, 1, ?) ON CONFLICT(id) DO UPDATE "
+                             "SET matches = matches + 1, seconds = seconds + excluded.seconds",
+                             (max(0.0, match.running),))
+
+    def _run(self):
+        conn = None
+        while True:
+            batch = [self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            matches = [match for match in batch if match is not None]
+            try:
+                if conn is None:
+                    conn = self._connect()
+                if matches:
+                    self._write(conn, matches)
+            except sqlite3.Error as e:
+                self.log(f"History: {len(matches)} match(es) could not be saved ({e}).", is_error=True)
+                if conn is not None:
+                    conn.close()
+                conn = None # Reconnect for the next batch
+            for _ in batch:
+                self._queue.task_done()
+            if None in batch:
+                break
+        if conn is not None:
+            conn.close()
+
+    def flush(self):
+        """Blocks until every queued match is written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Writes what is still queued and stops the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+_histories = {}
+_histories_lock = threading.Lock()
+
+def history_for(path):
+    """The shared MatchHistory of a database file, or None when history is off (no path)."""
+    if not path:
+        return None
+    with _histories_lock:
+        if path not in _histories:
+            _histories[path] = MatchHistory(path)
+        return _histories[path]
@@ -0,0 +1,75 @@
+import os
+import queue
+import atexit
+import threading
+
+class LogWriter:
+    """Queue-backed log file writer.
+
+    Callers only enqueue lines. One writer thread keeps the file open, writes whatever
+    has queued up in a single batch and rotates the file once it exceeds max_bytes
+    (debug_log.txt -> debug_log.txt.1 -> ... -> .<backups>).
+    """
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backups=3, flush_interval=0.5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, line):
+        self._queue.put(line)
+
+    def _drain(self, block):
+        lines = []
+        try:
+            lines.append(self._queue.get(timeout=self.flush_interval) if block else self._queue.get_nowait())
+            while True:
+                lines.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return lines
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{index}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _write_batch(self, f, lines):
+        f.write("".join(lines))
+        f.flush()
+        if self.max_bytes and f.tell() >= self.max_bytes:
+            f.close()
+            self._rotate()
+            return open(self.path, "a", encoding="utf-8")
+        return f
+
+    def _run(self):
+        f = None
+        while not self._stop.is_set() or not self._queue.empty():
+            lines = self._drain(block=not self._stop.is_set())
+            if not lines:
+                continue
+            try:
+                if f is None:
+                    f = open(self.path, "a", encoding="utf-8")
+                f = self._write_batch(f, lines)
+            except OSError:
+                f = None # Retry opening on the next batch, e.g. after the file was locked
+        if f is not None:
+            f.close()
+
+    def close(self):
+        """Flushes everything still queued and stops the writer thread."""
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join(timeout=2)
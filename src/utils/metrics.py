@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds, from template checks up to whole phases
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (approximate)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+class Metrics:
+    """Thread-safe registry of labelled counters and histograms with JSON/Prometheus export."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._exporter = None
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters.setdefault(self._key(name, labels), Counter()).inc(amount)
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            self._histograms.setdefault(self._key(name, labels), Histogram()).observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def histograms(self, name):
+        """{labels dict as tuple: Histogram} for one metric name."""
+        with self._lock:
+            return {labels: h for (n, labels), h in self._histograms.items() if n == name}
+
+    def counters(self, name):
+        with self._lock:
+            return {labels: c.value for (n, labels), c in self._counters.items() if n == name}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_json(self):
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "counters": [{"name": n, "labels": dict(l), "value": c.value}
+                             for (n, l), c in sorted(self._counters.items())],
+                "histograms": [{"name": n, "labels": dict(l), "count": h.count, "sum": h.sum,
+                                "buckets": dict(zip([str(b) for b in h.buckets] + ["+Inf"], h.counts))}
+                               for (n, l), h in sorted(self._histograms.items())]
+            }
+
+    def to_prometheus(self):
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+        lines = []
+        with self._lock:
+            for (name, labels), counter in sorted(self._counters.items()):
+                lines.append(f"{name}{fmt(labels)} {counter.value}")
+            for (name, labels), hist in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{fmt(labels)} {hist.sum}")
+                lines.append(f"{name}_count{fmt(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Writes a snapshot; .prom/.txt files get Prometheus text, anything else JSON."""
+        if path.endswith((".prom", ".txt")):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_json(), indent=2)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def start_export(self, path, interval=30.0):
+        """Dumps the metrics to `path` every `interval` seconds on a daemon thread."""
+        if self._exporter is not None or not path:
+            return
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump(path)
+                except OSError:
+                    pass
+        self._exporter = threading.Thread(target=run, name="MetricsExport", daemon=True)
+        self._exporter.start()
+
+metrics = Metrics()
@@ -0,0 +1,89 @@
+import sys
+import time
+import builtins
+import threading
+from contextlib import contextmanager
+from src.utils.metrics import metrics
+
+class StartupProfiler:
+    """Times startup: imports per module and init steps up to the first window.
+
+    The time to the first window is always recorded (startup_first_window_seconds in the
+    metrics export). enable() additionally wraps __import__ until the window is shown;
+    each import that loads new modules is recorded with its total time and its self time
+    (without the imports nested in it), like python -X importtime but also in frozen builds.
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.enabled = False
+        self.imports = [] # (name, self seconds, total seconds)
+        self.steps = [] # (name, seconds)
+        self.first_window = None
+        self._original_import = None
+        self._local = threading.local()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        stack = self._local.__dict__.setdefault("stack", [])
+        loaded = len(sys.modules)
+        stack.append(0.0) # Time spent in nested imports
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += total
+            if len(sys.modules) > loaded:
+                label = name
+                if level and globals: # Relative import: name it after the importing package
+                    package = (globals.get("__package__") or "").rsplit(".", level - 1)[0]
+                    label = f"{package}.{name}" if name else package
+                if fromlist and fromlist[0] != "*":
+                    names = ", ".join(fromlist[:3]) + (", ..." if len(fromlist) > 3 else "")
+                    label += f" ({names})"
+                self.imports.append((label, total - nested, total))
+
+    @contextmanager
+    def step(self, name):
+        """Times one init step; only recorded while profiling."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - start))
+
+    def window_shown(self):
+        """Records the time to the first window and stops timing imports."""
+        if self.first_window is not None:
+            return
+        self.first_window = time.perf_counter() - self.start
+        metrics.observe("startup_first_window_seconds", self.first_window)
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def report(self, top=25):
+        lines = [f"First window after {self.first_window or 0:.3f}s"]
+        if self.steps:
+            lines.append("\nInit steps:")
+            lines.extend(f"  {seconds * 1000:8.1f} ms  {name}" for name, seconds in self.steps)
+        if self.imports:
+            total = sum(own for _, own, _ in self.imports)
+            lines.append(f"\nImports: {len(self.imports)} taking {total:.3f}s, slowest by self time:")
+            lines.append("   self ms  total ms  module")
+            for name, own, cumulative in sorted(self.imports, key=lambda row: -row[1])[:top]:
+                lines.append(f"  {own * 1000:8.1f}  {cumulative * 1000:8.1f}  {name}")
+        return "\n".join(lines)
+
+profiler = StartupProfiler()
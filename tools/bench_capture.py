@@ -0,0 +1,33 @@
+"""Measures screen captures per second with per-check captures vs one frame per tick.
+
+Usage: python -m tools.bench_capture [seconds_per_mode]
+"""
+import sys
+import time
+from src.utils.config import load_config
+from src.core.vision import is_image_visible, grab_frame, capture_stats
+
+# The checks a single bot_loop pass can make in Phase 1
+TICK_CHECKS = ["return_to_lobby_alone", "ultimate", "open", "continue", "solo_mode", "br_mode"]
+
+def run(config, seconds, shared_frame):
+    capture_stats(reset=True)
+    ticks = 0
+    end = time.time() + seconds
+    while time.time() < end:
+        frame = grab_frame() if shared_frame else None
+        for name in TICK_CHECKS:
+            is_image_visible(name, config, frame=frame)
+        ticks += 1
+    stats = capture_stats(reset=True)
+    return ticks / stats["elapsed"], stats["rate"]
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    config = load_config()
+    for label, shared in (("per-check capture", False), ("shared frame", True)):
+        tick_rate, capture_rate = run(config, seconds, shared)
+        print(f"{label:>18}: {tick_rate:6.2f} ticks/s, {capture_rate:6.2f} captures/s")
+
+if __name__ == "__main__":
+    main()
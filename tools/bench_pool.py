@@ -0,0 +1,105 @@
+"""Compares in-process template matching with the worker-process pool under UI load.
+
+Usage:
+    python -m tools.bench_pool [--seconds 5] [--templates 7] [--processes 2] [--learned]
+
+A detection thread runs detect_all back to back on a synthetic 1080p scene while the main
+thread imitates the Tk loop: a 16 ms timer whose callbacks do a little Python work. For
+each mode it reports how late the UI ticks ran (the latency a user feels) and how many
+detect_all calls per second the detection thread managed. Without --learned every call
+scans the full frame, the worst case for the UI.
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+import numpy as np
+from src.core import vision, match_pool
+from src.core.template_pack import TemplatePack
+from tools.bench_roi import synthetic_scene
+
+UI_TICK = 0.016
+
+def make_templates(frame, count, directory):
+    """Template files cut from the scene, so every one of them is found."""
+    rng = np.random.default_rng(3)
+    images = {}
+    for index in range(count):
+        width, height = int(rng.integers(40, 200)), int(rng.integers(20, 80))
+        left = int(rng.integers(0, frame.image.width - width))
+        top = int(rng.integers(0, frame.image.height - height))
+        path = os.path.join(directory, f"bench_{index}.png")
+        frame.image.crop((left, top, left + width, top + height)).save(path)
+        images[f"bench_{index}"] = path
+    return images
+
+def ui_loop(seconds, busy):
+    """Runs fake UI ticks every UI_TICK seconds while `busy` is set; returns lateness in ms."""
+    lateness = []
+    next_tick = time.perf_counter()
+    end = next_tick + seconds
+    while time.perf_counter() < end:
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        lateness.append(max(0.0, time.perf_counter() - next_tick) * 1000)
+        sum(i * i for i in range(2000)) # A callback's worth of Python work
+        next_tick += UI_TICK
+    busy.clear()
+    return lateness
+
+def run_mode(image, config, seconds, learned):
+    busy = threading.Event()
+    busy.set()
+    calls = [0]
+    if config is None: # Baseline without detection
+        return ui_loop(seconds, busy), 0.0
+
+    def detect():
+        names = list(config["images"])
+        while busy.is_set():
+            if not learned:
+                vision.regions.forget()
+            vision.detect_all(vision.Frame(image), names, config) # Fresh frame: grayscale included
+            calls[0] += 1
+
+    vision.detect_all(vision.Frame(image), list(config["images"]), config) # Warm up (and start the pool)
+    thread = threading.Thread(target=detect, daemon=True)
+    thread.start()
+    lateness = ui_loop(seconds, busy)
+    thread.join()
+    return lateness, calls[0] / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--templates", type=int, default=7)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--learned", action="store_true", help="Keep learned ROIs between calls")
+    args = parser.parse_args()
+
+    vision.templates.pack = TemplatePack(None) # Keep the bench templates out of the real pack
+    directory = tempfile.mkdtemp()
+    frame, path = synthetic_scene(1920, 1080, path=os.path.join(directory, "bench.png"))
+    images = make_templates(frame, args.templates, directory)
+    print(f"{args.templates} templates on 1080p, {os.cpu_count()} CPUs, "
+          f"{'learned ROIs' if args.learned else 'full-frame scans'}, {args.seconds:.0f}s per mode")
+
+    idle, _ = run_mode(frame.image, None, 1.0, True)
+    print(f"{'idle':<18} UI tick lateness p50 {np.percentile(idle, 50):6.2f} ms  "
+          f"p95 {np.percentile(idle, 95):6.2f} ms  max {max(idle):7.2f} ms")
+    for label, processes in (("in-process", 0), (f"pool x{args.processes}", args.processes)):
+        config = {"images": images, "confidence": 0.8, "rois": {}, "match_processes": processes}
+        lateness, rate = run_mode(frame.image, config, args.seconds, args.learned)
+        print(f"{label:<18} UI tick lateness p50 {np.percentile(lateness, 50):6.2f} ms  "
+              f"p95 {np.percentile(lateness, 95):6.2f} ms  max {max(lateness):7.2f} ms  "
+              f"| {rate:6.1f} detect_all/s")
+    match_pool.shutdown()
+
+    for file_name in os.listdir(directory):
+        os.remove(os.path.join(directory, file_name))
+    os.rmdir(directory)
+
+if __name__ == "__main__":
+    main()
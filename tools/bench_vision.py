@@ -0,0 +1,151 @@
+"""Vision micro-benchmarks across resolutions, template sizes, confidences and engines.
+
+Usage:
+    python -m tools.bench_vision [--quick] [--frames DIR] [--capture]
+                                 [--save-baseline FILE] [--compare FILE] [--tolerance 0.2]
+
+Synthetic scenes are generated at 1080p, 1440p and 4K. --frames adds recorded screenshots,
+matched against the templates in config.json. --capture also times live screen captures.
+--compare exits with status 1 when a case's p95 is slower than the baseline by more than
+the tolerance, so it can gate a release.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import numpy as np
+from PIL import Image
+from src.core import vision, backends
+from src.core.template_pack import TemplatePack
+from src.utils.config import load_config
+from tools.bench_roi import synthetic_scene
+
+RESOLUTIONS = {"1080p": (1920, 1080), "1440p": (2560, 1440), "4k": (3840, 2160)}
+TEMPLATE_SIZES = [(48, 24), (120, 40), (320, 100)]
+CONFIDENCES = [0.7, 0.8, 0.9]
+ENGINES = ["full", "pyramid"]
+
+def percentiles(samples):
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99, "mean": float(np.mean(samples))}
+
+def measure(func, iterations):
+    """Latency samples in ms and the peak traced allocation per call in KiB."""
+    func() # Warm caches (template decode, frame grayscale) outside the measurement
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return samples, peak / 1024
+
+def bench_locate(name, frame, config, iterations, learned):
+    def call():
+        if not learned:
+            vision.regions.forget(name)
+        vision.locate(name, config, frame=frame)
+    return measure(call, iterations)
+
+def bench_find_and_click(name, frame, config, iterations):
+    # Clicks go to a recording sink on a virtual clock, so only the detection overhead is timed
+    def call():
+        vision.regions.forget(name)
+        vision.find_and_click(name, config, lambda: True, lambda msg: None, frame=frame)
+    return measure(call, iterations)
+
+def report(results, key, samples, memory):
+    stats = percentiles(samples)
+    stats["mem_kib"] = memory
+    results[key] = stats
+    print(f"{key:<48} p50 {stats['p50']:8.2f}  p95 {stats['p95']:8.2f}  p99 {stats['p99']:8.2f} ms"
+          f"  mem {memory:8.1f} KiB")
+
+def synthetic_cases(results, iterations, quick):
+    resolutions = {"1080p": RESOLUTIONS["1080p"]} if quick else RESOLUTIONS
+    for res_name, (width, height) in resolutions.items():
+        for tmpl_w, tmpl_h in TEMPLATE_SIZES:
+            frame, path = synthetic_scene(width, height, tmpl_w, tmpl_h, path="bench_vision_template.png")
+            if (tmpl_w, tmpl_h) == TEMPLATE_SIZES[0]:
+                samples, memory = measure(lambda: vision.Frame(frame.image).gray, iterations)
+                report(results, f"{res_name} prep (grayscale)", samples, memory)
+
+            for engine in ENGINES:
+                for conf in ([0.8] if quick else CONFIDENCES):
+                    config = {"images": {"bench": path}, "confidence": conf, "rois": {},
+                              "match_engine": engine}
+                    base = f"{res_name} {tmpl_w}x{tmpl_h} {engine} c{conf}"
+                    report(results, f"{base} full-scan", *bench_locate("bench", frame, config, iterations, False))
+                    report(results, f"{base} learned-roi", *bench_locate("bench", frame, config, iterations, True))
+            config = {"images": {"bench": path}, "confidence": 0.8, "rois": {}}
+            report(results, f"{res_name} {tmpl_w}x{tmpl_h} find_and_click",
+                   *bench_find_and_click("bench", frame, config, iterations))
+    os.remove("bench_vision_template.png")
+
+def recorded_cases(results, frames_dir, iterations):
+    config = load_config()
+    files = sorted(f for f in os.listdir(frames_dir) if f.lower().endswith((".png", ".jpg", ".jpeg")))
+    for file_name in files:
+        frame = vision.Frame(Image.open(os.path.join(frames_dir, file_name)).convert("RGB"))
+        for name in config["images"]:
+            if vision.templates.get(name, config) is None:
+                continue
+            report(results, f"recorded {file_name} {name}", *bench_locate(name, frame, config, iterations, False))
+        names = list(config["images"])
+        samples, memory = measure(lambda: vision.detect_all(frame, names, config), iterations)
+        report(results, f"recorded {file_name} detect_all", samples, memory)
+
+def capture_cases(results, iterations):
+    samples, memory = measure(lambda: vision.grab_frame().gray, iterations)
+    report(results, "live capture + grayscale", samples, memory)
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for key, stats in results.items():
+        old = baseline.get(key)
+        if old and stats["p95"] > old["p95"] * (1 + tolerance):
+            regressions.append((key, old["p95"], stats["p95"]))
+    for key, old, new in regressions:
+        print(f"REGRESSION {key}: p95 {old:.2f} -> {new:.2f} ms")
+    print(f"{len(regressions)} regression(s) against {baseline_path} (tolerance {tolerance:.0%})")
+    return not regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--quick", action="store_true", help="1080p and one confidence only")
+    parser.add_argument("--frames", help="Directory of recorded screenshots")
+    parser.add_argument("--capture", action="store_true", help="Also time live screen captures")
+    parser.add_argument("--save-baseline", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare p95 latencies against this baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    vision.templates.pack = TemplatePack(None) # Keep the bench templates out of the real pack
+    # Never move the real mouse: find_and_click clicks into a recording sink on a virtual clock
+    clock = backends.VirtualClock()
+    backends.use(clock=clock, sink=backends.RecordingSink(clock))
+
+    results = {}
+    synthetic_cases(results, args.iterations, args.quick)
+    if args.frames:
+        recorded_cases(results, args.frames, args.iterations)
+    if args.capture:
+        capture_cases(results, args.iterations)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}, f, indent=2)
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Compiles the templates in config.json into the template pack and lists its contents.
+
+Usage:
+    python -m tools.build_pack [--force]
+
+Only templates whose source file changed are decoded again (the bot does the same at
+startup); --force drops the pack and rebuilds every entry.
+"""
+import os
+import argparse
+from src.core.template_pack import pack
+from src.utils.config import load_config
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="Rebuild every template")
+    args = parser.parse_args()
+
+    config = load_config()
+    if args.force and os.path.exists(pack.path):
+        os.remove(pack.path)
+    rebuilt = pack.sync(config)
+    entries = pack.entries()
+
+    print(f"{pack.path}: {len(entries)} template(s), rebuilt {len(rebuilt)}")
+    print("  name                      size       threshold  roi")
+    for (name, _), entry in sorted(entries.items()):
+        size = f"{entry['size'][0]}x{entry['size'][1]}"
+        threshold = "-" if entry["threshold"] is None else f"{entry['threshold']:.2f}"
+        marker = "*" if name in rebuilt else " "
+        print(f"{marker} {name:<25} {size:<10} {threshold:<10} {entry['roi'] or 'Auto'}")
+    missing = [name for name, path in config["images"].items() if (name, path) not in entries]
+    if missing:
+        print(f"Missing or unreadable: {', '.join(missing)}")
+
+if __name__ == "__main__":
+    main()
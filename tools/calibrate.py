@@ -0,0 +1,157 @@
+"""Calibrates per-template confidence thresholds on a folder of labeled screenshots.
+
+Usage:
+    python -m tools.calibrate <frames_dir> [--step 0.05] [--write] [--rois]
+
+<frames_dir>/labels.json lists the targets present on each screenshot; every template
+not listed counts as absent:
+    {"lobby_001.png": ["change", "solo_mode"], "results_004.png": ["open"], "ingame_010.png": []}
+
+For each template in config.json the tool sweeps thresholds and reports precision, recall
+and mean match time (full-frame search with the configured match engine). It recommends
+the middle of the range that keeps precision at 1.0 with the best recall, or the best F1
+when no threshold is free of false positives. --write stores the recommendations in
+config["thresholds"]; --rois also pins an ROI around all true hits of each template.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from PIL import Image
+from src.core import vision
+from src.core.template_pack import TemplatePack
+from src.utils.config import load_config
+
+ROI_MAX_SHARE = 0.25 # Hits spread over more of the screen than this get no pinned ROI
+
+def load_corpus(frames_dir):
+    labels_path = os.path.join(frames_dir, "labels.json")
+    if not os.path.exists(labels_path):
+        sys.exit(f"{labels_path} not found, see the usage in tools/calibrate.py")
+    with open(labels_path, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    corpus = []
+    for file_name, present in sorted(labels.items()):
+        path = os.path.join(frames_dir, file_name)
+        if not os.path.exists(path):
+            print(f"Skipping {file_name}: file not found")
+            continue
+        corpus.append((file_name, vision.Frame(Image.open(path).convert("RGB")), set(present)))
+    return corpus
+
+def sweep(name, corpus, config, thresholds):
+    """(rows, mean match ms); a row per threshold: (threshold, precision, recall, true hit boxes).
+
+    The score does not depend on the threshold, so each screenshot is matched once (with
+    the lowest threshold, for which the pyramid engine refines the most candidates) and
+    the thresholds are swept over the cached results.
+    """
+    matches, times = [], []
+    for _, frame, present in corpus:
+        start = time.perf_counter()
+        score, box = vision.search_template(frame, name, config, min(thresholds))
+        times.append((time.perf_counter() - start) * 1000)
+        matches.append((score, box, name in present))
+
+    rows = []
+    for threshold in thresholds:
+        tp = fp = fn = 0
+        boxes = []
+        for score, box, positive in matches:
+            hit = box is not None and score >= threshold
+            if hit and positive:
+                tp += 1
+                boxes.append(box)
+            elif hit:
+                fp += 1
+            elif positive:
+                fn += 1
+        precision = tp / (tp + fp) if tp + fp else 1.0
+        recall = tp / (tp + fn) if tp + fn else 1.0
+        rows.append((threshold, precision, recall, boxes))
+    return rows, float(np.mean(times))
+
+def recommend(rows):
+    """(threshold, reason) from the sweep rows."""
+    exact = [row for row in rows if row[1] == 1.0]
+    if exact:
+        best_recall = max(row[2] for row in exact)
+        band = [row[0] for row in exact if row[2] == best_recall]
+        # The middle of the band leaves margin on both sides for lighting and scaling changes
+        threshold = round((min(band) + max(band)) / 2, 2)
+        return threshold, f"precision 1.00, recall {best_recall:.2f} for {min(band):.2f}..{max(band):.2f}"
+    def f1(row):
+        return 2 * row[1] * row[2] / (row[1] + row[2]) if row[1] + row[2] else 0.0
+    best = max(rows, key=f1)
+    return best[0], f"no threshold without false positives, best F1 {f1(best):.2f}"
+
+def suggest_roi(boxes, frame):
+    """Padded union of the hit boxes as [left, top, right, bottom], or None when too spread out."""
+    if not boxes:
+        return None
+    pad = vision.HitRegions.PADDING
+    width, height = frame.image.width, frame.image.height
+    left = max(0, min(b.left for b in boxes) - pad)
+    top = max(0, min(b.top for b in boxes) - pad)
+    right = min(width, max(b.left + b.width for b in boxes) + pad)
+    bottom = min(height, max(b.top + b.height for b in boxes) + pad)
+    if (right - left) * (bottom - top) > ROI_MAX_SHARE * width * height:
+        return None
+    return [left, top, right, bottom]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("frames", help="Directory with screenshots and labels.json")
+    parser.add_argument("--step", type=float, default=0.05, help="Threshold sweep step")
+    parser.add_argument("--min", type=float, default=0.5, help="Lowest threshold swept")
+    parser.add_argument("--write", action="store_true", help="Write the thresholds to config.json")
+    parser.add_argument("--rois", action="store_true", help="Also pin ROIs around the true hits (with --write)")
+    args = parser.parse_args()
+
+    vision.templates.pack = TemplatePack(None) # Calibration only reads the templates
+    config = load_config()
+    corpus = load_corpus(args.frames)
+    if not corpus:
+        sys.exit("No labeled screenshots found")
+    # Loose full-frame searches only: no pinned or learned ROIs during the sweep
+    sweep_config = {**config.snapshot(), "rois": {}}
+    thresholds = [round(t, 2) for t in np.arange(args.min, 0.99 + 1e-9, args.step)]
+
+    chosen, rois = {}, {}
+    for name in config["images"]:
+        if vision.templates.get(name, config) is None:
+            print(f"\n{name}: template missing, skipped")
+            continue
+        positives = sum(1 for _, _, present in corpus if name in present)
+        rows, ms = sweep(name, corpus, sweep_config, thresholds)
+        print(f"\n{name} ({positives} positive / {len(corpus)} screenshots, {ms:.2f} ms per match)")
+        print("  threshold  precision  recall")
+        for threshold, precision, recall, _ in rows:
+            print(f"  {threshold:9.2f}  {precision:9.2f}  {recall:6.2f}")
+        if not positives:
+            print("  -> no positive screenshots, keeping the current threshold")
+            continue
+        threshold, reason = recommend(rows)
+        chosen[name] = threshold
+        print(f"  -> {threshold:.2f} ({reason}; current {vision.confidence_for(name, config):.2f})")
+        if args.rois:
+            boxes = next(row[3] for row in rows if row[0] >= threshold)
+            roi = suggest_roi(boxes, corpus[0][1])
+            if roi:
+                rois[name] = roi
+                print(f"  -> ROI {roi}")
+            else:
+                print("  -> hits too spread out for a pinned ROI")
+
+    if args.write and chosen:
+        config["thresholds"] = {**config["thresholds"], **chosen}
+        if rois:
+            config["rois"] = {**config["rois"], **rois}
+        config.save()
+        config.flush()
+        print(f"\nWrote {len(chosen)} threshold(s){f' and {len(rois)} ROI(s)' if rois else ''} to {config.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Regression check for startup: the UI module must import fast and without the heavy modules.
+
+Usage:
+    python -m tools.check_startup [--budget 1.0] [--window-budget SECONDS]
+
+Imports src.ui.app in a fresh interpreter and exits with status 1 when one of LAZY_MODULES
+was loaded by it (they must wait until first use) or the import took longer than --budget
+seconds. --window-budget also starts the app with main.py --profile-startup and fails when
+the first window took longer; that part needs a display.
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+# Loaded on first use, never while the window is being built
+LAZY_MODULES = ("cv2", "pyautogui", "pydirectinput", "requests", "src.core.vision", "src.core.bot_engine")
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import src.ui.app
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "loaded": [name for name in %r if name in sys.modules]}))
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=1.0, help="Seconds allowed for importing src.ui.app")
+    parser.add_argument("--window-budget", type=float, help="Also time the first window (needs a display)")
+    args = parser.parse_args()
+
+    failures = []
+    probe = subprocess.run([sys.executable, "-c", PROBE % (LAZY_MODULES,)], capture_output=True, text=True)
+    if probe.returncode != 0:
+        sys.exit(f"Importing src.ui.app failed:\n{probe.stderr}")
+    result = json.loads(probe.stdout.splitlines()[-1])
+    print(f"import src.ui.app: {result['seconds']:.3f}s (budget {args.budget:.3f}s)")
+    if result["loaded"]:
+        failures.append(f"loaded at import time: {', '.join(result['loaded'])}")
+    if result["seconds"] > args.budget:
+        failures.append(f"import took {result['seconds']:.3f}s, over the {args.budget:.3f}s budget")
+
+    if args.window_budget is not None:
+        window = subprocess.run([sys.executable, "main.py", "--profile-startup",
+                                 "--startup-budget", str(args.window_budget)], capture_output=True, text=True)
+        print(window.stdout.splitlines()[0] if window.stdout else window.stderr.strip())
+        if window.returncode != 0:
+            failures.append(f"first window over the {args.window_budget:.3f}s budget or the app failed to start")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Local fake Discord webhook to check that notifications never block the caller.
+
+Usage:
+    python -m tools.fake_webhook [--messages 20] [--delay 1.0] [--rate-limit-every 5]
+
+Starts a slow, rate-limiting webhook on localhost and queues messages via the notifier.
+It reports how long each send() blocked the caller (should be well under a millisecond)
+and how long delivery of everything took, including the 429 retry_after waits.
+"""
+import os
+import json
+import time
+import tempfile
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.utils.discord import DiscordNotifier
+
+class FakeWebhook(BaseHTTPRequestHandler):
+    delay = 1.0
+    rate_limit_every = 5
+    received = []
+    requests_seen = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.lock:
+            FakeWebhook.requests_seen += 1
+            limited = self.rate_limit_every and FakeWebhook.requests_seen % self.rate_limit_every == 0
+        time.sleep(self.delay)
+        if limited:
+            payload = json.dumps({"message": "You are being rate limited.", "retry_after": 0.5}).encode()
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        with self.lock:
+            FakeWebhook.received.append((time.time(), len(body)))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=1.0, help="Server response delay in seconds")
+    parser.add_argument("--rate-limit-every", type=int, default=5, help="Answer every Nth request with 429")
+    args = parser.parse_args()
+
+    FakeWebhook.delay = args.delay
+    FakeWebhook.rate_limit_every = args.rate_limit_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeWebhook)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/webhooks/fake"
+
+    outbox = os.path.join(tempfile.mkdtemp(), "outbox.json")
+    notifier = DiscordNotifier(outbox_path=outbox, timeout=5, backoff=0.2)
+    blocked = []
+    started = time.time()
+    for i in range(args.messages):
+        t = time.perf_counter()
+        notifier.send(url, f"Queue #{i} Finish time: 0 min 0 sec")
+        blocked.append((time.perf_counter() - t) * 1000)
+
+    while notifier.pending_count() and time.time() - started < args.messages * (args.delay + 2) + 10:
+        time.sleep(0.05)
+    server.shutdown()
+
+    print(f"send() blocked the caller: max {max(blocked):.3f} ms, avg {sum(blocked) / len(blocked):.3f} ms")
+    print(f"Delivered {len(FakeWebhook.received)}/{args.messages} in {time.time() - started:.1f}s "
+          f"({FakeWebhook.requests_seen} requests incl. 429 retries)")
+    print(f"Undelivered left in outbox: {notifier.pending_count()}")
+
+if __name__ == "__main__":
+    main()
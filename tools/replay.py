@@ -0,0 +1,101 @@
+"""Runs BotEngine against recorded frames on a virtual clock, recording every input action.
+
+Usage:
+    python -m tools.replay <frames_dir_or_video> [--fps 2] [--actions actions.json]
+
+Frame i is shown from i / fps seconds of virtual time. The run ends when the recording
+does. Prints the status timeline, the input actions and the reaction latency between
+a frame change and the first input action after it.
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+from src.core import backends
+from src.core.bot_engine import BotEngine
+from src.utils.config import load_config
+
+class ReplayApp:
+    """Minimal stand-in for SCGMAutoBR: config, run flag, logging and status."""
+    def __init__(self, config, source, clock, verbose=False):
+        self.config = config
+        self.source = source
+        self.clock = clock
+        self.verbose = verbose
+        self.match_count = 0
+        self.logs = []
+        self.statuses = []
+
+    @property
+    def is_running(self):
+        return not self.source.exhausted
+
+    def log(self, msg, is_error=False):
+        self.logs.append((self.clock.time(), msg))
+        if self.verbose or is_error:
+            print(f"[{self.clock.time():9.2f}] {'[ERROR] ' if is_error else ''}{msg}")
+
+    def update_status(self, text, color):
+        if not self.statuses or self.statuses[-1][1] != text:
+            self.statuses.append((self.clock.time(), text))
+
+    def update_match_count(self):
+        pass
+
+def reaction_latencies(switch_times, actions):
+    """Delay from each frame change to the first input action before the next change."""
+    latencies = []
+    action_times = [t for t, _, _ in actions]
+    for i, switched in enumerate(switch_times):
+        next_switch = switch_times[i + 1] if i + 1 < len(switch_times) else float("inf")
+        reacted = next((t for t in action_times if switched <= t < next_switch), None)
+        if reacted is not None:
+            latencies.append(reacted - switched)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("frames", help="Directory of frames (sorted by name) or a video file")
+    parser.add_argument("--fps", type=float, default=2.0, help="Frame rate of an image directory")
+    parser.add_argument("--actions", help="Write the recorded input actions to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Print engine log lines")
+    args = parser.parse_args()
+
+    clock = backends.VirtualClock()
+    source = backends.ReplaySource(args.frames, clock, fps=args.fps)
+    sink = backends.RecordingSink(clock)
+    backends.use(clock=clock, source=source, sink=sink)
+    if source.frame_count == 0:
+        sys.exit(f"No frames found in {args.frames}")
+
+    config = load_config()
+    config["vision_worker"] = False # Detect inline so everything runs on the virtual clock
+    config["input_thread"] = False # Play input inline on the virtual clock as well
+    config["history_file"] = None # Replayed matches stay out of the match history
+    config["recorder_seconds"] = 0 # No flight recorder, its compression would slow the replay down
+    config["discord_webhook"] = ""
+    app = ReplayApp(config, source, clock, args.verbose)
+
+    started = time.perf_counter()
+    BotEngine(app).bot_loop()
+    wall = time.perf_counter() - started
+
+    print(f"Replayed {source.frame_count} frames: {clock.time():.1f}s virtual in {wall:.1f}s wall "
+          f"({clock.time() / max(wall, 1e-6):.0f}x real time), {app.match_count} match(es)")
+    print("Status timeline:")
+    for t, status in app.statuses:
+        print(f"  {t:9.2f}  {status}")
+    print(f"Input actions: {len(sink.actions)}")
+
+    latencies = reaction_latencies(source.switch_times, sink.actions)
+    if latencies:
+        print(f"Reaction latency over {len(latencies)} frame changes: "
+              f"median {statistics.median(latencies):.2f}s, max {max(latencies):.2f}s")
+
+    if args.actions:
+        with open(args.actions, "w") as f:
+            json.dump([{"t": t, "action": a, "args": list(p)} for t, a, p in sink.actions], f, indent=2)
+
+if __name__ == "__main__":
+    main()